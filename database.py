@@ -1,113 +1,700 @@
 import asyncpg
+import asyncio
+import orjson
 from fastapi import HTTPException
+from contextlib import asynccontextmanager, contextmanager
 import os
+import time
 import logging
+from services.metrics import metrics
+from services.single_flight import SingleFlight, flight_key
 
 logging.basicConfig(level=logging.INFO)
 
 
+# Метрики пула соединений и вызовов процедур
+DB_ACQUIRE_SECONDS = metrics.histogram(
+    "db_pool_acquire_seconds", "Время ожидания соединения из пула", ("pool",)
+)
+DB_POOL_CONNECTIONS = metrics.gauge(
+    "db_pool_connections", "Соединения пула по состоянию", ("pool", "state")
+)
+DB_SHED_REQUESTS = metrics.counter(
+    "db_shed_requests_total", "Запросы, отклоненные с 503 из-за перегрузки", ("reason",)
+)
+DB_REPLICA_LAG_SECONDS = metrics.gauge(
+    "db_replica_lag_seconds", "Отставание реплики от основного сервера"
+)
+DB_REPLICA_FALLBACKS = metrics.counter(
+    "db_replica_fallbacks_total", "Чтения, переключенные с реплики на основной сервер"
+)
+DB_CALL_SECONDS = metrics.histogram(
+    "db_call_seconds", "Время выполнения процедуры или запроса", ("procedure",)
+)
+DB_CALL_ERRORS = metrics.counter(
+    "db_call_errors_total", "Количество ошибок процедуры или запроса", ("procedure",)
+)
+DB_STATEMENT_LOOKUPS = metrics.counter(
+    "db_statement_lookups_total",
+    "Обращения к реестру запросов: hit - выражение уже подготовлено на соединении",
+    ("result",),
+)
+
+
+def _encode_json(value) -> str:
+    """Кодирует параметр json/jsonb, готовые JSON-строки передаются как есть"""
+    if isinstance(value, (str, bytes)):
+        return value if isinstance(value, str) else value.decode()
+    return orjson.dumps(value).decode()
+
+
+@contextmanager
+def _track_call(name: str):
+    """Замеряет время вызова и считает ошибки"""
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        DB_CALL_ERRORS.inc(procedure=name)
+        raise
+    finally:
+        DB_CALL_SECONDS.observe(time.perf_counter() - started, procedure=name)
+
+
+# Хранимые процедуры и функции, которые вызываются из роутеров.
+# Значение - вид вызова: "procedure" (SELECT * FROM ...) или "function" (SELECT ...).
+# Процедуры, возвращающие JSON, можно также вызвать как "raw" (SELECT ...::text)
+KNOWN_STATEMENTS = {
+    "get_events_by_date": "procedure",
+    "get_event_details": "procedure",
+    "get_event_images": "procedure",
+    "check_email_availability": "function",
+    "add_event": "function",
+    "add_event_category_func": "function",
+    "insert_event_image": "function",
+    "delete_event_image": "function",
+    "register_user": "function",
+    "save_refresh_token": "function",
+}
+
+# Процедуры только для чтения, которые можно выполнять на реплике
+READ_ONLY_STATEMENTS = {
+    "get_events_by_date",
+    "get_event_details",
+    "get_event_images",
+}
+
+
+class DatabaseOverloadedError(Exception):
+    """Соединение из пула не получено в пределах бюджета ожидания"""
+
+
+# Ошибки реплики, при которых чтение повторяется на основном сервере
+REPLICA_FALLBACK_ERRORS = (
+    OSError,
+    asyncio.TimeoutError,
+    asyncpg.exceptions.InterfaceError,
+    asyncpg.exceptions.PostgresConnectionError,
+    asyncpg.exceptions.CannotConnectNowError,
+    # Отмена запроса из-за конфликта с восстановлением на реплике
+    asyncpg.exceptions.SerializationError,
+    DatabaseOverloadedError,
+)
+
+# Ошибки, при которых запрос отклоняется с 503 вместо ожидания
+SHED_ERRORS = (
+    DatabaseOverloadedError,
+    asyncio.TimeoutError,
+    # Превышен statement_timeout
+    asyncpg.exceptions.QueryCanceledError,
+)
+
+# Отставание реплики в секундах
+REPLICA_LAG_QUERY = """
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+END
+"""
+
+
+class StatementRegistry:
+    """
+    Реестр запросов для вызова хранимых процедур и функций.
+
+    Текст запроса для каждой процедуры строится один раз и дальше
+    переиспользуется без изменений, поэтому asyncpg подготавливает его
+    на соединении только при первом вызове, а затем берет готовое
+    выражение из кэша соединения.
+
+    Счетчики hits/misses - оценка по запросам, которые реестр уже видел
+    на соединении, а не состояние кэша asyncpg: она совпадает с ним,
+    пока число разных запросов не превышает statement_cache_size пула.
+    Учет соединения удаляется, когда соединение закрывается.
+    """
+
+    def __init__(self):
+        self._queries = {}
+        self._prepared = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def build_query(kind: str, name: str, argc: int) -> str:
+        placeholders = ", ".join([f"${i+1}" for i in range(argc)])
+        if kind == "procedure":
+            return f"SELECT * FROM {name}({placeholders})"
+        if kind == "raw":
+            # JSON результат процедуры как текст, без декодирования в объекты
+            return f"SELECT {name}({placeholders})::text"
+        return f"SELECT {name}({placeholders})"
+
+    def query(self, kind: str, name: str, argc: int) -> str:
+        """Возвращает текст запроса, построенный один раз на процедуру"""
+        key = (kind, name, argc)
+        query = self._queries.get(key)
+        if query is None:
+            if name not in KNOWN_STATEMENTS:
+                logging.warning(f"Procedure {name} is not in KNOWN_STATEMENTS")
+            query = self._queries[key] = self.build_query(kind, name, argc)
+        return query
+
+    def track(self, connection, query: str, role: str = "primary"):
+        """Учитывает вызов запроса на соединении как попадание или промах"""
+        key = (role, connection.get_server_pid())
+        prepared = self._prepared.setdefault(key, set())
+        if query in prepared:
+            self.hits += 1
+            DB_STATEMENT_LOOKUPS.inc(result="hit")
+        else:
+            prepared.add(query)
+            self.misses += 1
+            DB_STATEMENT_LOOKUPS.inc(result="miss")
+
+    def forget(self, role: str, server_pid: int):
+        """Сбрасывает учет соединения: при его создании и закрытии"""
+        self._prepared.pop((role, server_pid), None)
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "queries": len(self._queries),
+            "connections": len(self._prepared),
+        }
+
+
+def _function_error(error: Exception, validate_errors: bool) -> HTTPException:
+    """Преобразует ошибку функции PostgreSQL в HTTPException"""
+    if validate_errors:
+        # Определяем тип ошибки и возвращаем соответствующий код
+        error_message = str(error).lower()
+        if any(
+            keyword in error_message
+            for keyword in [
+                "не может быть пустым",
+                "не может быть раньше",
+                "не существует",
+                "не могут быть пустыми",
+            ]
+        ):
+            return HTTPException(status_code=400, detail=str(error))
+    return HTTPException(status_code=500, detail=f"Database error: {str(error)}")
+
+
+class Transaction:
+    """Вызовы процедур внутри одной транзакции, см. Database.transaction()"""
+
+    def __init__(self, database: "Database", connection):
+        self.database = database
+        self.connection = connection
+
+    async def execute_procedure(self, procedure_name: str, *args):
+        query = self.database.statements.query("procedure", procedure_name, len(args))
+        self.database.statements.track(self.connection, query)
+        try:
+            with _track_call(procedure_name):
+                return await self.connection.fetch(query, *args)
+        except SHED_ERRORS as e:
+            raise self.database._unavailable(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    async def execute_function(
+        self, function_name: str, *args, validate_errors: bool = True
+    ):
+        """Выполняет функцию и возвращает скалярное значение"""
+        query = self.database.statements.query("function", function_name, len(args))
+        self.database.statements.track(self.connection, query)
+        try:
+            with _track_call(function_name):
+                return await self.connection.fetchval(query, *args)
+        except SHED_ERRORS as e:
+            raise self.database._unavailable(e)
+        except asyncpg.exceptions.PostgresError as e:
+            raise _function_error(e, validate_errors)
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Internal server error: {str(e)}"
+            )
+
+
 class Database:
     def __init__(self):
         self.pool = None
+        self.replica_pool = None
+        self.replica_dsn = None
+        self.replica_max_lag = 5.0
+        self.replica_check_interval = 5.0
+        self.replica_healthy = False
+        self._replica_monitor = None
+        self.min_size = 5
+        self.max_size = 20
+        self.acquire_timeout = 2.0
+        self.statement_timeout = 10.0
+        self.max_waiting = 100
+        self.retry_after = 1
+        self._waiting = 0
+        self.dsn = None
+        self._listener = None
+        self._listener_task = None
+        self._channels = {}
+        self.statements = StatementRegistry()
+        self.flights = SingleFlight("db")
+        DB_POOL_CONNECTIONS.set_function(self._pool_samples)
+
+    def _pool_options(self, role: str) -> dict:
+        async def init(connection):
+            await self._init_connection(connection, role)
+
+        return {
+            "min_size": self.min_size,
+            "max_size": self.max_size,
+            "ssl": False,
+            # Сервер сам отменяет запросы дольше statement_timeout
+            "server_settings": {
+                "statement_timeout": str(int(self.statement_timeout * 1000))
+            },
+            "command_timeout": self.statement_timeout + 1,
+            # Подготовленные выражения живут, пока живет соединение
+            "max_cached_statement_lifetime": 0,
+            "init": init,
+        }
+
+    def _load_limits(self):
+        """Читает размеры пула и таймауты из окружения"""
+        self.min_size = int(os.getenv("DB_POOL_MIN_SIZE", "5"))
+        self.max_size = int(os.getenv("DB_POOL_MAX_SIZE", "20"))
+        self.acquire_timeout = float(os.getenv("DB_ACQUIRE_TIMEOUT_SECONDS", "2"))
+        self.statement_timeout = float(os.getenv("DB_STATEMENT_TIMEOUT_SECONDS", "10"))
+        self.max_waiting = int(os.getenv("DB_MAX_WAITING", "100"))
+        self.retry_after = int(os.getenv("DB_RETRY_AFTER_SECONDS", "1"))
 
     async def connect(self):
-        dsn = os.getenv("DATABASE_URL")
+        self._load_limits()
+        dsn = self.dsn = os.getenv("DATABASE_URL")
         logging.info(f"Attempting to connect to database with DSN: {dsn}")
         try:
             self.pool = await asyncpg.create_pool(
-                dsn=dsn,
-                min_size=5,
-                max_size=20,
-                ssl=False,
+                dsn=dsn, **self._pool_options("primary")
             )
             logging.info("Database connection pool created successfully.")
         except Exception as e:
             logging.error(f"Failed to create database pool: {str(e)}")
             raise
 
+        # Реплика необязательна: без нее все запросы идут на основной сервер
+        self.replica_dsn = os.getenv("REPLICA_DATABASE_URL")
+        if self.replica_dsn:
+            self.replica_max_lag = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+            self.replica_check_interval = float(
+                os.getenv("REPLICA_CHECK_INTERVAL_SECONDS", "5")
+            )
+            await self._connect_replica()
+            self._replica_monitor = asyncio.create_task(self._monitor_replica())
+
+        if self._channels:
+            await self._connect_listener()
+
+    async def _connect_replica(self):
+        try:
+            self.replica_pool = await asyncpg.create_pool(
+                dsn=self.replica_dsn, **self._pool_options("replica")
+            )
+            await self._check_replica()
+            logging.info("Replica connection pool created successfully.")
+        except Exception as e:
+            # Реплика недоступна - читаем с основного сервера и пробуем позже
+            logging.warning(f"Failed to create replica pool: {str(e)}")
+            self.replica_healthy = False
+
+    async def _check_replica(self):
+        """Проверяет доступность реплики и ее отставание"""
+        try:
+            async with self.replica_pool.acquire(
+                timeout=self.replica_check_interval
+            ) as connection:
+                lag = await connection.fetchval(
+                    REPLICA_LAG_QUERY, timeout=self.replica_check_interval
+                )
+            lag = float(lag or 0)
+            DB_REPLICA_LAG_SECONDS.set(lag)
+            healthy = lag <= self.replica_max_lag
+            if not healthy and self.replica_healthy:
+                logging.warning(f"Replica lag {lag:.1f}s, reading from primary")
+        except Exception as e:
+            if self.replica_healthy:
+                logging.warning(f"Replica check failed: {str(e)}")
+            healthy = False
+        self.replica_healthy = healthy
+
+    async def _monitor_replica(self):
+        """Периодически проверяет реплику и переподключается к ней"""
+        while True:
+            await asyncio.sleep(self.replica_check_interval)
+            if self.replica_pool is None:
+                await self._connect_replica()
+            else:
+                await self._check_replica()
+
+    async def _init_connection(self, connection, role: str):
+        """Вызывается пулом для каждого нового соединения"""
+        server_pid = connection.get_server_pid()
+        self.statements.forget(role, server_pid)
+        # Пул периодически закрывает простаивающие соединения,
+        # их учет в реестре больше не нужен
+        connection.add_termination_listener(
+            lambda _: self.statements.forget(role, server_pid)
+        )
+        # json/jsonb декодируются сразу в объекты Python через orjson,
+        # поэтому роутерам не нужно повторно разбирать строки
+        for type_name in ("jsonb", "json"):
+            await connection.set_type_codec(
+                type_name,
+                encoder=_encode_json,
+                decoder=orjson.loads,
+                schema="pg_catalog",
+            )
+
+    def _pool_samples(self):
+        """Текущее состояние пулов для метрик"""
+        samples = []
+        for role, pool in (("primary", self.pool), ("replica", self.replica_pool)):
+            if not pool:
+                continue
+            size = pool.get_size()
+            idle = pool.get_idle_size()
+            samples += [
+                ({"pool": role, "state": "in_use"}, size - idle),
+                ({"pool": role, "state": "idle"}, idle),
+                ({"pool": role, "state": "min"}, pool.get_min_size()),
+                ({"pool": role, "state": "max"}, pool.get_max_size()),
+            ]
+        return samples
+
+    @asynccontextmanager
+    async def _acquire(self, role: str = "primary"):
+        """
+        Берет соединение из пула, замеряя время ожидания.
+        Если очередь ожидания переполнена или соединение не получено
+        за acquire_timeout, выбрасывает DatabaseOverloadedError.
+        """
+        pool = self.replica_pool if role == "replica" else self.pool
+        if self._waiting >= self.max_waiting:
+            DB_SHED_REQUESTS.inc(reason="queue_full")
+            raise DatabaseOverloadedError(f"Too many requests waiting for {role} pool")
+
+        started = time.perf_counter()
+        self._waiting += 1
+        try:
+            connection = await pool.acquire(timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            DB_SHED_REQUESTS.inc(reason="acquire_timeout")
+            raise DatabaseOverloadedError(f"Timed out waiting for {role} pool")
+        finally:
+            self._waiting -= 1
+            DB_ACQUIRE_SECONDS.observe(time.perf_counter() - started, pool=role)
+
+        try:
+            yield connection
+        finally:
+            await pool.release(connection)
+
+    def _unavailable(self, error: Exception) -> HTTPException:
+        """Быстрый отказ с 503, чтобы не копить очередь при перегрузке БД"""
+        logging.warning(f"Database overloaded, shedding request: {str(error)}")
+        return HTTPException(
+            status_code=503,
+            detail="Сервис временно перегружен, повторите запрос позже",
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    async def _run(self, operation, read_only: bool = False, key=None):
+        """
+        Выполняет operation(connection, role) на реплике для чтения
+        или на основном сервере. Если реплика недоступна, чтение
+        повторяется на основном сервере.
+
+        Одновременные чтения с одинаковым key выполняются одним запросом
+        к БД, все вызовы получают его результат.
+        """
+        if read_only and key is not None:
+            return await self.flights.do(
+                key, lambda: self._run_once(operation, read_only)
+            )
+        return await self._run_once(operation, read_only)
+
+    async def _run_once(self, operation, read_only: bool):
+        if read_only and self.replica_pool is not None and self.replica_healthy:
+            try:
+                async with self._acquire("replica") as connection:
+                    return await operation(connection, "replica")
+            except REPLICA_FALLBACK_ERRORS as e:
+                logging.warning(f"Replica read failed, using primary: {str(e)}")
+                DB_REPLICA_FALLBACKS.inc()
+                self.replica_healthy = False
+
+        async with self._acquire() as connection:
+            return await operation(connection, "primary")
+
+    def listen(self, channel: str, callback, on_reconnect=None):
+        """
+        Подписывает callback(payload: str) на канал LISTEN/NOTIFY.
+        Для подписок используется отдельное постоянное соединение с основным
+        сервером. on_reconnect вызывается после восстановления соединения,
+        так как уведомления за время разрыва потеряны.
+        """
+        self._channels.setdefault(channel, []).append((callback, on_reconnect))
+
+    def _dispatch_notification(self, connection, pid, channel, payload):
+        for callback, _ in self._channels.get(channel, ()):
+            try:
+                callback(payload)
+            except Exception as e:
+                logging.error(f"Notification handler for {channel} failed: {str(e)}")
+
+    async def _open_listener(self):
+        connection = await asyncpg.connect(dsn=self.dsn, ssl=False)
+        try:
+            for channel in self._channels:
+                await connection.add_listener(channel, self._dispatch_notification)
+        except Exception:
+            await connection.close()
+            raise
+        connection.add_termination_listener(self._on_listener_terminated)
+        self._listener = connection
+
+    async def _connect_listener(self):
+        try:
+            await self._open_listener()
+            logging.info(f"Listening for notifications on {list(self._channels)}")
+        except Exception as e:
+            logging.warning(f"Failed to start notification listener: {str(e)}")
+            self._on_listener_terminated(None)
+
+    def _on_listener_terminated(self, connection):
+        """Соединение подписок потеряно - переподключаемся в фоне"""
+        self._listener = None
+        if self._listener_task is None or self._listener_task.done():
+            self._listener_task = asyncio.create_task(self._reconnect_listener())
+
+    async def _reconnect_listener(self):
+        delay = 1.0
+        while True:
+            await asyncio.sleep(delay)
+            try:
+                await self._open_listener()
+            except Exception as e:
+                logging.warning(f"Notification listener reconnect failed: {str(e)}")
+                delay = min(delay * 2, 30.0)
+                continue
+
+            logging.info("Notification listener reconnected.")
+            for callbacks in self._channels.values():
+                for _, on_reconnect in callbacks:
+                    if on_reconnect is not None:
+                        on_reconnect()
+            return
+
+    async def notify(self, channel: str, payload: str):
+        """Отправляет NOTIFY всем процессам, подписанным на канал"""
+        try:
+            async with self._acquire() as connection:
+                await connection.execute("SELECT pg_notify($1, $2)", channel, payload)
+        except Exception as e:
+            # Уведомление не критично для запроса, остальные воркеры
+            # в худшем случае увидят изменения по истечении TTL кэша
+            logging.warning(f"Failed to send notification to {channel}: {str(e)}")
+
     async def disconnect(self):
+        if self._listener_task:
+            self._listener_task.cancel()
+        if self._listener:
+            self._listener.remove_termination_listener(self._on_listener_terminated)
+            await self._listener.close()
+        if self._replica_monitor:
+            self._replica_monitor.cancel()
+        if self.replica_pool:
+            await self.replica_pool.close()
         if self.pool:
             await self.pool.close()
 
-    async def execute_procedure(self, procedure_name: str, *args):
-        async with self.pool.acquire() as connection:
-            try:
-                # Формируем вызов хранимой процедуры
-                placeholders = ", ".join([f"${i+1}" for i in range(len(args))])
-                query = f"SELECT * FROM {procedure_name}({placeholders})"
+    async def execute_procedure(
+        self, procedure_name: str, *args, use_replica: bool = True
+    ):
+        """
+        Выполняет процедуру и возвращает ее строки. Процедуры только для
+        чтения выполняются на реплике, если не передано use_replica=False.
+        """
+        # Берем вызов хранимой процедуры из реестра
+        query = self.statements.query("procedure", procedure_name, len(args))
 
-                result = await connection.fetch(query, *args)
-                return result
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        async def operation(connection, role):
+            self.statements.track(connection, query, role)
+            with _track_call(procedure_name):
+                return await connection.fetch(query, *args)
+
+        try:
+            return await self._run(
+                operation,
+                read_only=use_replica and procedure_name in READ_ONLY_STATEMENTS,
+                key=flight_key("fetch", query, *args),
+            )
+        except SHED_ERRORS as e:
+            raise self._unavailable(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    async def execute_procedure_raw(
+        self, procedure_name: str, *args, use_replica: bool = True
+    ):
+        """
+        Выполняет процедуру, возвращающую json/jsonb, и отдает результат
+        как байты JSON без декодирования. None, если процедура вернула NULL.
+        """
+        query = self.statements.query("raw", procedure_name, len(args))
+
+        async def operation(connection, role):
+            self.statements.track(connection, query, role)
+            with _track_call(procedure_name):
+                return await connection.fetchval(query, *args)
+
+        try:
+            result = await self._run(
+                operation,
+                read_only=use_replica and procedure_name in READ_ONLY_STATEMENTS,
+                key=flight_key("fetchval", query, *args),
+            )
+        except SHED_ERRORS as e:
+            raise self._unavailable(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+        return result.encode() if result is not None else None
 
     async def execute_function(
         self, function_name: str, *args, validate_errors: bool = True
     ):
         """Выполняет функцию и возвращает скалярное значение"""
-        async with self.pool.acquire() as connection:
-            try:
-                placeholders = ", ".join([f"${i+1}" for i in range(len(args))])
-                query = f"SELECT {function_name}({placeholders})"
-
-                result = await connection.fetchval(query, *args)
-                return result
-            except asyncpg.exceptions.PostgresError as e:
-                if validate_errors:
-                    # Определяем тип ошибки и возвращаем соответствующий код
-                    error_message = str(e).lower()
-                    if any(
-                        keyword in error_message
-                        for keyword in [
-                            "не может быть пустым",
-                            "не может быть раньше",
-                            "не существует",
-                            "не могут быть пустыми",
-                        ]
-                    ):
-                        raise HTTPException(status_code=400, detail=str(e))
-                    else:
-                        raise HTTPException(
-                            status_code=500, detail=f"Database error: {str(e)}"
-                        )
-                else:
-                    raise HTTPException(
-                        status_code=500, detail=f"Database error: {str(e)}"
-                    )
-            except HTTPException:
-                # Если уже сгенерирована HTTPException, перебрасываем её
-                raise
-            except Exception as e:
-                raise HTTPException(
-                    status_code=500, detail=f"Internal server error: {str(e)}"
-                )
+        query = self.statements.query("function", function_name, len(args))
+
+        async def operation(connection, role):
+            self.statements.track(connection, query, role)
+            with _track_call(function_name):
+                return await connection.fetchval(query, *args)
+
+        try:
+            return await self._run(
+                operation,
+                read_only=function_name in READ_ONLY_STATEMENTS,
+                key=flight_key("fetchval", query, *args),
+            )
+        except SHED_ERRORS as e:
+            raise self._unavailable(e)
+        except asyncpg.exceptions.PostgresError as e:
+            raise _function_error(e, validate_errors)
+        except HTTPException:
+            # Если уже сгенерирована HTTPException, перебрасываем её
+            raise
+        except Exception as e:
+            raise HTTPException(
+                status_code=500, detail=f"Internal server error: {str(e)}"
+            )
+
+    @asynccontextmanager
+    async def transaction(self):
+        """
+        Выполняет несколько вызовов процедур на одном соединении основного
+        сервера в одной транзакции. При ошибке внутри блока все изменения
+        откатываются.
+
+        Пример:
+            async with db.transaction() as tx:
+                user_id = await tx.execute_function("register_user", ...)
+                await tx.execute_function("save_refresh_token", user_id, ...)
+        """
+        try:
+            async with self._acquire() as connection:
+                async with connection.transaction():
+                    yield Transaction(self, connection)
+        except DatabaseOverloadedError as e:
+            # Вызовы внутри транзакции сами преобразуют ошибки,
+            # сюда попадает только перегрузка пула при получении соединения
+            raise self._unavailable(e)
 
-    async def fetch(self, query: str, *args):
+    async def fetch(self, query: str, *args, use_replica: bool = True):
         """Выполняет произвольный запрос и возвращает результат"""
-        async with self.pool.acquire() as connection:
-            try:
-                result = await connection.fetch(query, *args)
-                return result
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    async def fetchval(self, query: str, *args):
+        async def operation(connection, role):
+            with _track_call("query"):
+                return await connection.fetch(query, *args)
+
+        try:
+            return await self._run(
+                operation,
+                read_only=use_replica,
+                key=flight_key("fetch", query, *args),
+            )
+        except SHED_ERRORS as e:
+            raise self._unavailable(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    async def fetchval(self, query: str, *args, use_replica: bool = True):
         """Выполняет запрос и возвращает скалярное значение"""
-        async with self.pool.acquire() as connection:
-            try:
-                result = await connection.fetchval(query, *args)
-                return result
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-    async def fetch_one(self, query: str, *args):
+        async def operation(connection, role):
+            with _track_call("query"):
+                return await connection.fetchval(query, *args)
+
+        try:
+            return await self._run(
+                operation,
+                read_only=use_replica,
+                key=flight_key("fetchval", query, *args),
+            )
+        except SHED_ERRORS as e:
+            raise self._unavailable(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+    async def fetch_one(self, query: str, *args, use_replica: bool = True):
         """Выполняет запрос и возвращает одну запись"""
-        async with self.pool.acquire() as connection:
-            try:
-                result = await connection.fetchrow(query, *args)
-                return result
-            except Exception as e:
-                raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+        async def operation(connection, role):
+            with _track_call("query"):
+                return await connection.fetchrow(query, *args)
+
+        try:
+            return await self._run(
+                operation,
+                read_only=use_replica,
+                key=flight_key("fetchrow", query, *args),
+            )
+        except SHED_ERRORS as e:
+            raise self._unavailable(e)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 
 # Глобальный экземпляр базы данных
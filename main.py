@@ -7,10 +7,13 @@ load_dotenv()
 
 from database import db
 from services.config import settings
+from services.reference_data import reference_data
+from services.image_pool import image_pool
 from routers.events import router as events_router
 from routers.images import router as images_router
 from routers.locations import router as locations_router
 from routers.auth.router import router as auth_router
+from routers.metrics import router as metrics_router
 
 app = FastAPI(title="Mestio API", version="1.0.0")
 
@@ -34,12 +37,15 @@ app.mount(
 # События запуска/остановки
 @app.on_event("startup")
 async def startup():
+    image_pool.start()
     await db.connect()
+    await reference_data.load()
 
 
 @app.on_event("shutdown")
 async def shutdown():
     await db.disconnect()
+    image_pool.shutdown()
 
 
 # Регистрируем роутеры
@@ -47,3 +53,4 @@ app.include_router(events_router)
 app.include_router(images_router)
 app.include_router(locations_router)
 app.include_router(auth_router, prefix="/api/v1")
+app.include_router(metrics_router)
@@ -1,6 +1,7 @@
 from . import events
 from . import images
 from . import locations
+from . import metrics
 
 
-__all__ = ["events", "images", "locations"]
+__all__ = ["events", "images", "locations", "metrics"]
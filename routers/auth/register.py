@@ -241,18 +241,6 @@ async def register(request: Request, data: RegisterRequest):
     device_info = request.headers.get("User-Agent", "")
 
     try:
-        # Вызов хранимой процедуры register_user
-        user_id = await db.execute_function(
-            "register_user",
-            email,
-            password_hash,
-            None,  # name
-            None,  # country
-            None,  # city
-            1,  # role_id (обычный пользователь)
-            device_info,
-        )
-
         # Настройки JWT
         SECRET_KEY = os.getenv("SECRET_KEY")
         if not SECRET_KEY:
@@ -265,6 +253,33 @@ async def register(request: Request, data: RegisterRequest):
         ACCESS_TOKEN_EXPIRE_MINUTES = 15
         REFRESH_TOKEN_EXPIRE_DAYS = 30
 
+        # Создание refresh токена (случайная строка 64 символа)
+        refresh_token = secrets.token_urlsafe(64)
+
+        # Регистрация и сохранение refresh токена в одной транзакции:
+        # если токен не сохранился, пользователь тоже не создается
+        async with db.transaction() as tx:
+            # Вызов хранимой процедуры register_user
+            user_id = await tx.execute_function(
+                "register_user",
+                email,
+                password_hash,
+                None,  # name
+                None,  # country
+                None,  # city
+                1,  # role_id (обычный пользователь)
+                device_info,
+            )
+
+            # Сохранение refresh токена в БД
+            new_token_id = await tx.execute_function(
+                "save_refresh_token",
+                user_id,
+                refresh_token,
+                device_info,
+                REFRESH_TOKEN_EXPIRE_DAYS,
+            )
+
         # Создание access токена
         access_token_expires = timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token_payload = {
@@ -274,18 +289,6 @@ async def register(request: Request, data: RegisterRequest):
         }
         access_token = jwt.encode(access_token_payload, SECRET_KEY, algorithm=ALGORITHM)
 
-        # Создание refresh токена (случайная строка 64 символа)
-        refresh_token = secrets.token_urlsafe(64)
-
-        # Сохранение refresh токена в БД
-        new_token_id = await db.execute_function(
-            "save_refresh_token",
-            user_id,
-            refresh_token,
-            device_info,
-            REFRESH_TOKEN_EXPIRE_DAYS,
-        )
-
         # Отправка welcome email асинхронно
         from routers.auth.email_service import EmailService
 
@@ -318,6 +321,12 @@ async def register(request: Request, data: RegisterRequest):
 
     except Exception as e:
         # Обработка специфичных ошибок
+        # Перегрузка БД: клиент должен повторить запрос после Retry-After
+        if (
+            isinstance(e, HTTPException)
+            and e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        ):
+            raise
         error_msg = str(e)
         if "USER_ALREADY_EXISTS" in error_msg:
             raise HTTPException(
@@ -97,6 +97,12 @@ async def check_email(
         return {"available": is_available}
 
     except Exception as e:
+        # Перегрузка БД: клиент должен повторить запрос после Retry-After
+        if (
+            isinstance(e, HTTPException)
+            and e.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        ):
+            raise
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail={"error": "internal_error", "message": "Внутренняя ошибка сервера"},
@@ -5,7 +5,9 @@ import asyncpg
 import logging
 import json
 from database import db
+from services.reference_data import reference_data
 from .models import EventRequest
+from .feed import invalidate_events_by_date
 
 
 router = APIRouter()
@@ -34,6 +36,19 @@ async def create_event(event: EventRequest):
     Создать новое событие
     """
     try:
+        # Проверяем локацию и категорию по справочникам в памяти,
+        # не занимая соединение с БД для заведомо некорректных запросов
+        if not await reference_data.locations.exists(event.location_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Локация с ID {event.location_id} не существует",
+            )
+        if not await reference_data.categories.exists(event.category_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Категория с ID {event.category_id} не существует",
+            )
+
         # Преобразуем расписание в JSONB
         def convert_schedule_dates_to_iso(schedule_list):
             """Преобразует даты в расписании в ISO строки для JSON сериализации"""
@@ -59,6 +74,11 @@ async def create_event(event: EventRequest):
             event.duration,
             schedule_dates,
         )
+
+        # Лента за дни нового события больше не актуальна
+        await invalidate_events_by_date(
+            *{schedule.date.date() for schedule in event.schedules}
+        )
         return event_id
 
     except HTTPException:
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException
 import asyncpg
 import logging
 from database import db
+from services.cache import cache_invalidator
 from .models import EventCategoryRequest
 
 
@@ -34,8 +35,14 @@ async def create_event_category(category: EventCategoryRequest):
         category_id = await db.execute_function(
             "add_event_category_func", category.category_name
         )
+
+        # Справочник категорий перечитывается во всех воркерах
+        await cache_invalidator.publish("event_categories", category_id)
         return category_id
 
+    except HTTPException:
+        # Перебрасываем HTTPException из базы данных (уже с правильным кодом)
+        raise
     except asyncpg.exceptions.UniqueViolationError:
         raise HTTPException(
             status_code=409,
@@ -0,0 +1,141 @@
+import logging
+from datetime import date
+from typing import Dict, Iterable, Optional, Tuple
+from database import db
+from services.cache import (
+    event_details_cache,
+    cache_invalidator,
+    get_or_load,
+    read_from_replica,
+)
+from services.config import settings
+from services.http_cache import CachedBody
+from .models import EventDetailsFullResponse
+
+
+# Детали нескольких событий одним запросом, JSON каждого - текстом
+EVENT_DETAILS_BATCH_QUERY = """
+SELECT t.event_id, t.day, get_event_details(t.event_id, t.day)::text
+FROM unnest($1::int[], $2::date[]) AS t(event_id, day)
+"""
+
+
+def normalize_event_details(raw: Optional[bytes]) -> Optional[bytes]:
+    """
+    Приводит JSON деталей из процедуры к виду, который отдается клиенту.
+    None, если процедура вернула NULL или пустой объект (событие не найдено)
+    """
+    if raw is None or raw.strip() in (b"null", b"{}"):
+        return None
+    if settings.JSON_PASSTHROUGH:
+        if settings.STRICT_RESPONSE_VALIDATION:
+            EventDetailsFullResponse.model_validate_json(raw)
+        return raw
+    return EventDetailsFullResponse.model_validate_json(raw).model_dump_json().encode()
+
+
+async def _fetch_event_details(
+    event_id: int, date: date, use_replica: bool = True
+) -> Optional[bytes]:
+    """Получает детали события из БД в виде JSON, None если событие не найдено"""
+    if settings.JSON_PASSTHROUGH:
+        # JSON из процедуры отдается клиенту как есть, без повторной сериализации
+        raw = await db.execute_procedure_raw(
+            "get_event_details", event_id, date, use_replica=use_replica
+        )
+        return normalize_event_details(raw)
+
+    # Вызываем хранимую процедуру с ID события и датой
+    result = await db.execute_procedure(
+        "get_event_details", event_id, date, use_replica=use_replica
+    )
+
+    # Результат процедуры - JSONB объект в первом столбце первой строки,
+    # кодек соединения уже декодировал его в словарь
+    json_result = result[0][0] if result and len(result[0]) > 0 else None
+    if not json_result:
+        return None
+
+    # Преобразуем JSONB результат в Pydantic модель для валидации и документирования
+    return EventDetailsFullResponse(**json_result).model_dump_json().encode()
+
+
+def _cache_key(event_id: int, day: date) -> tuple:
+    # От даты зависят только часы работы локации, а они задаются по дню недели
+    return event_id, day.isoweekday()
+
+
+def _entry(
+    event_id: int, body: Optional[bytes]
+) -> Tuple[Optional[CachedBody], tuple]:
+    """Запись кэша деталей и ее тег event:<id>, None если событие не найдено"""
+    if body is None:
+        return None, ()
+    return CachedBody(body), (f"event:{event_id}",)
+
+
+async def get_event_details_json(
+    event_id: int, day: date
+) -> Tuple[Optional[CachedBody], bool]:
+    """
+    Возвращает детали события в виде JSON с ETag, по возможности из кэша,
+    и признак того, что данные устарели. None, если событие не найдено.
+    """
+
+    async def load(use_replica: bool):
+        return _entry(event_id, await _fetch_event_details(event_id, day, use_replica))
+
+    return await get_or_load(event_details_cache, _cache_key(event_id, day), load)
+
+
+async def get_event_details_many(
+    keys: Iterable[Tuple[int, date]]
+) -> Dict[Tuple[int, date], Optional[CachedBody]]:
+    """
+    Возвращает детали нескольких событий. События, которых нет в кэше,
+    загружаются из БД одним запросом (по одной дате на день недели).
+    """
+    result = {}
+    missing = {}
+    for event_id, day in keys:
+        entry = event_details_cache.get(_cache_key(event_id, day))
+        result[(event_id, day)] = entry
+        if entry is None:
+            missing.setdefault(_cache_key(event_id, day), (event_id, day))
+
+    if missing:
+        with event_details_cache.loading() as generation:
+            rows = await db.fetch(
+                EVENT_DETAILS_BATCH_QUERY,
+                [event_id for event_id, _ in missing.values()],
+                [day for _, day in missing.values()],
+                use_replica=read_from_replica(event_details_cache),
+            )
+            loaded = {}
+            for row in rows:
+                raw = row[2].encode() if row[2] is not None else None
+                key = _cache_key(row[0], row[1])
+                try:
+                    body = normalize_event_details(raw)
+                except ValueError as e:
+                    # Некорректные данные одного события не ломают весь ответ:
+                    # оно возвращается как ненайденное и не кэшируется
+                    logging.error(f"Invalid details for event {row[0]}: {str(e)}")
+                    body = None
+                entry, tags = _entry(row[0], body)
+                if entry is not None:
+                    event_details_cache.set(
+                        key, entry, tags=tags, generation=generation
+                    )
+                loaded[key] = entry
+        for event_id, day in result:
+            if result[(event_id, day)] is None:
+                result[(event_id, day)] = loaded.get(_cache_key(event_id, day))
+    return result
+
+
+def _on_event_changed(keys: list):
+    event_details_cache.invalidate_tag(*(f"event:{event_id}" for event_id in keys))
+
+
+cache_invalidator.subscribe("event", _on_event_changed)
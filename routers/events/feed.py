@@ -0,0 +1,255 @@
+from datetime import date, datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+import orjson
+from fastapi import HTTPException
+from pydantic import TypeAdapter
+from database import db
+from services.cache import (
+    events_by_date_cache,
+    cache_invalidator,
+    get_or_load,
+    read_from_replica,
+)
+from services.config import settings
+from services.http_cache import CachedBody
+from services.reference_data import reference_data
+from .models import EventByDateResponse
+
+
+events_by_date_adapter = TypeAdapter(List[EventByDateResponse])
+
+# Лента за несколько дней одним запросом, JSON каждого дня - текстом
+EVENTS_FOR_DAYS_QUERY = """
+SELECT day, get_events_by_date(day)::text
+FROM unnest($1::date[]) AS day
+"""
+
+
+def _normalize_body(raw: bytes) -> bytes:
+    """Приводит JSON ленты из процедуры к виду, который отдается клиенту"""
+    if raw is None or raw == b"null":
+        return b"[]"
+    if settings.JSON_PASSTHROUGH:
+        if settings.STRICT_RESPONSE_VALIDATION:
+            events_by_date_adapter.validate_json(raw)
+        return raw
+    events = events_by_date_adapter.validate_json(raw)
+    return events_by_date_adapter.dump_json(events)
+
+
+async def _fetch_events_by_date(
+    search_date: date, use_replica: bool = True
+) -> bytes:
+    """Получает ленту событий за день из БД в виде готового JSON"""
+    if settings.JSON_PASSTHROUGH:
+        # JSON из процедуры отдается клиенту как есть, без повторной сериализации
+        raw = await db.execute_procedure_raw(
+            "get_events_by_date", search_date, use_replica=use_replica
+        )
+        return _normalize_body(raw)
+
+    # Вызываем хранимую процедуру
+    result = await db.execute_procedure(
+        "get_events_by_date", search_date, use_replica=use_replica
+    )
+
+    # Результат процедуры - JSONB массив в первом столбце первой строки,
+    # кодек соединения уже декодировал его в список словарей
+    json_result = result[0][0] if result and len(result[0]) > 0 else None
+
+    # Если результат - None, возвращаем пустой список
+    if json_result is None:
+        json_result = []
+
+    events = events_by_date_adapter.validate_python(json_result)
+    return events_by_date_adapter.dump_json(events)
+
+
+def _day_entry(body: bytes) -> Tuple[CachedBody, set]:
+    """Запись кэша ленты за день и ее теги event:<id>"""
+    events = orjson.loads(body)
+    return CachedBody(body), {f"event:{event['event_id']}" for event in events}
+
+
+async def get_events_by_date_json(search_date: date) -> Tuple[CachedBody, bool]:
+    """
+    Возвращает ленту событий за день в виде JSON с ETag, по возможности
+    из кэша, и признак того, что лента устарела (обновляется в фоне или
+    БД недоступна). Записи кэша помечаются тегами event:<id>, чтобы
+    изменения события (например, новое изображение) сбрасывали все дни,
+    где оно есть.
+    """
+
+    async def load(use_replica: bool):
+        return _day_entry(await _fetch_events_by_date(search_date, use_replica))
+
+    return await get_or_load(events_by_date_cache, search_date.isoformat(), load)
+
+
+async def get_events_for_days(days: Iterable[date]) -> Dict[date, CachedBody]:
+    """
+    Возвращает ленты за несколько дней. Дни, которых нет в кэше,
+    загружаются из БД одним запросом и сохраняются в кэш.
+    """
+    result = {}
+    missing = []
+    for day in days:
+        entry = events_by_date_cache.get(day.isoformat())
+        if entry is None:
+            missing.append(day)
+        else:
+            result[day] = entry
+
+    if missing:
+        with events_by_date_cache.loading() as generation:
+            rows = await db.fetch(
+                EVENTS_FOR_DAYS_QUERY,
+                missing,
+                use_replica=read_from_replica(events_by_date_cache),
+            )
+            for row in rows:
+                raw = row[1].encode() if row[1] is not None else None
+                entry, tags = _day_entry(_normalize_body(raw))
+                events_by_date_cache.set(
+                    row[0].isoformat(), entry, tags=tags, generation=generation
+                )
+                result[row[0]] = entry
+    return result
+
+
+# События из переданных, которые относятся к указанным категориям и локациям.
+# NULL вместо массива означает, что по этому полю не фильтруем
+EVENTS_FILTER_QUERY = """
+SELECT e.id
+FROM events e
+WHERE e.id = ANY($1::int[])
+  AND ($2::int[] IS NULL OR e.category_id = ANY($2::int[]))
+  AND ($3::int[] IS NULL OR e.location_id = ANY($3::int[]))
+"""
+
+
+class EventFilter:
+    """
+    Фильтр событий ленты по категориям, локациям и цене.
+
+    Лента содержит только названия категорий и локаций, а они могут
+    совпадать у разных записей, поэтому фильтр по ID проверяется в БД:
+    resolve() загружает ID подходящих событий, apply() использует их.
+    """
+
+    def __init__(
+        self,
+        category_ids: Optional[List[int]] = None,
+        location_ids: Optional[List[int]] = None,
+        price_min: Optional[int] = None,
+        price_max: Optional[int] = None,
+        free_only: bool = False,
+    ):
+        self.category_ids = category_ids
+        self.location_ids = location_ids
+        self.price_min = price_min
+        self.price_max = price_max
+        self.free_only = free_only
+        # ID событий, подходящих по категориям и локациям (см. resolve)
+        self.event_ids = set()
+
+    @property
+    def by_reference(self) -> bool:
+        return self.category_ids is not None or self.location_ids is not None
+
+    @property
+    def active(self) -> bool:
+        return (
+            self.by_reference
+            or self.price_min is not None
+            or self.price_max is not None
+            or self.free_only
+        )
+
+    async def resolve(self, events: Iterable[dict]):
+        """Загружает, какие из событий подходят по категориям и локациям"""
+        if not self.by_reference:
+            return
+        event_ids = list({event["event_id"] for event in events})
+        if event_ids:
+            rows = await db.fetch(
+                EVENTS_FILTER_QUERY, event_ids, self.category_ids, self.location_ids
+            )
+            self.event_ids.update(row["id"] for row in rows)
+
+    def matches(self, event: dict) -> bool:
+        # Событие без цены считается бесплатным
+        price = event.get("price") or 0
+        if self.free_only and price != 0:
+            return False
+        if self.price_min is not None and price < self.price_min:
+            return False
+        if self.price_max is not None and price > self.price_max:
+            return False
+        if self.by_reference and event["event_id"] not in self.event_ids:
+            return False
+        return True
+
+    def apply(self, events: List[dict]) -> List[dict]:
+        return [event for event in events if self.matches(event)]
+
+
+async def build_event_filter(
+    category_ids: Optional[List[int]] = None,
+    location_ids: Optional[List[int]] = None,
+    price_min: Optional[int] = None,
+    price_max: Optional[int] = None,
+    free_only: bool = False,
+) -> EventFilter:
+    """
+    Строит фильтр по ID категорий и локаций, цене и бесплатности.
+    Несуществующие ID категорий и локаций - ошибка 400.
+    """
+    for category_id in category_ids or ():
+        if not await reference_data.categories.exists(category_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Категория с ID {category_id} не существует",
+            )
+    for location_id in location_ids or ():
+        if not await reference_data.locations.exists(location_id):
+            raise HTTPException(
+                status_code=400,
+                detail=f"Локация с ID {location_id} не существует",
+            )
+    return EventFilter(
+        category_ids or None, location_ids or None, price_min, price_max, free_only
+    )
+
+
+def time_sort_key(event: dict):
+    return datetime.fromisoformat(event["date"]), event["event_id"]
+
+
+def price_sort_key(event: dict):
+    return event.get("price") or 0, time_sort_key(event)
+
+
+async def invalidate_events_by_date(*dates: date):
+    """Сбрасывает кэш ленты за указанные дни во всех воркерах"""
+    await cache_invalidator.publish(
+        "events_by_date", *(search_date.isoformat() for search_date in dates)
+    )
+
+
+async def invalidate_event(event_id: int):
+    """Сбрасывает кэши, зависящие от события, во всех воркерах"""
+    await cache_invalidator.publish("event", event_id)
+
+
+def _on_events_by_date_changed(keys: list):
+    events_by_date_cache.invalidate(*keys)
+
+
+def _on_event_changed(keys: list):
+    # Лента за все дни, где встречается событие
+    events_by_date_cache.invalidate_tag(*(f"event:{event_id}" for event_id in keys))
+
+
+cache_invalidator.subscribe("events_by_date", _on_events_by_date_changed)
+cache_invalidator.subscribe("event", _on_event_changed)
@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import List
 import asyncpg
-from database import db
+from services.config import settings
+from services.reference_data import reference_data
+from services.http_cache import json_response
 from .models import EventCategoryResponse
 
 
@@ -22,22 +24,20 @@ router = APIRouter()
     response_description="Список всех категорий событий",
     tags=["Категории"],
 )
-async def get_all_event_categories():
+async def get_all_event_categories(request: Request):
     """
     Получить все категории событий
     """
     try:
-        # Запрос для получения всех категорий
-        query = "SELECT id, name FROM event_categories ORDER BY name"
-        result = await db.fetch(query)
-
-        # Преобразуем результат в список словарей для совместимости с Pydantic
-        categories = []
-        for record in result:
-            categories.append({"id": record["id"], "name": record["name"]})
-
-        return categories
-
+        # Справочник хранится в памяти в виде готового отсортированного JSON
+        entry = await reference_data.categories.get_json()
+        return json_response(
+            request, entry.body, entry.etag, max_age=settings.REFERENCE_HTTP_MAX_AGE
+        )
+
+    except HTTPException:
+        # Перебрасываем HTTPException (404, 503 при перегрузке БД) без изменений
+        raise
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
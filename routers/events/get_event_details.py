@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Query, HTTPException, Request
 from datetime import date
 import asyncpg
-import json
-from database import db
+from services.config import settings
+from services.http_cache import json_response
+from .details import get_event_details_json
 from .models import EventDetailsFullResponse
 
 
@@ -25,11 +26,18 @@ router = APIRouter()
     - Использует хранимую процедуру `get_event_details` для получения данных
     - Время работы локации возвращается для дня недели, соответствующего переданной дате
     - Может возвращать null значения для необязательных полей
+    - Ответ кэшируется по (event_id, день недели): от даты зависят только часы работы
+    - Поддерживает ETag / If-None-Match: неизмененные данные возвращают 304
+    - Если БД медленная или недоступна, отдаются последние данные из кэша
+      с заголовком X-Cache-Status: STALE
+    - В images каждое загруженное изображение представлено всеми вариантами
+      качества: <uuid>_original.jpg, <uuid>_compressed.jpg, <uuid>_thumbnail.jpg
     """,
     response_description="Детальная информация о событии и локации в формате JSON",
     tags=["События"],
 )
 async def get_event_details(
+    request: Request,
     event_id: int,
     date: date = Query(
         ...,
@@ -40,34 +48,24 @@ async def get_event_details(
     Получить детальную информацию о событии по его ID и дате
     """
     try:
-        # Вызываем хранимую процедуру с ID события и датой
-        result = await db.execute_procedure("get_event_details", event_id, date)
-
-        # Проверяем, есть ли результат
-        if result and len(result) > 0:
-            # Результат процедуры - JSONB объект в первом столбце первой строки
-            json_result = result[0][0] if result[0] and len(result[0]) > 0 else None
-
-            if json_result:
-                # Проверяем тип json_result и при необходимости десериализуем его
-                if isinstance(json_result, str):
-                    import json as json_module
-
-                    json_result = json_module.loads(json_result)
-
-                # Преобразуем JSONB результат в Pydantic модель для валидации и документирования
-                return EventDetailsFullResponse(**json_result)
-            else:
-                # Если событие не найдено, возвращаем HTTP 404
-                raise HTTPException(
-                    status_code=404, detail=f"Событие с ID {event_id} не найдено"
-                )
-        else:
+        entry, stale = await get_event_details_json(event_id, date)
+        if entry is None:
             # Если событие не найдено, возвращаем HTTP 404
             raise HTTPException(
                 status_code=404, detail=f"Событие с ID {event_id} не найдено"
             )
 
+        return json_response(
+            request,
+            entry.body,
+            entry.etag,
+            max_age=settings.EVENTS_HTTP_MAX_AGE,
+            stale=stale,
+        )
+
+    except HTTPException:
+        # Перебрасываем HTTPException (404, 503 при перегрузке БД) без изменений
+        raise
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
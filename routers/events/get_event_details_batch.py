@@ -0,0 +1,56 @@
+from fastapi import APIRouter, HTTPException, Response
+from typing import Dict
+import asyncpg
+import orjson
+from .details import get_event_details_many
+from .models import EventDetailsBatchRequest, EventDetailsBatchItem
+
+
+router = APIRouter()
+
+
+@router.post(
+    "/details/batch",
+    response_model=Dict[str, EventDetailsBatchItem],
+    summary="Получить детальную информацию о нескольких событиях",
+    description="""
+    Этот эндпоинт возвращает детальную информацию сразу о нескольких событиях.
+
+    **Особенности:**
+    - Принимает до 100 пар (event_id, date)
+    - События, которых нет в кэше, загружаются одним запросом к БД
+    - Ответ - словарь с ключами вида `<event_id>:<date>`
+    - Для ненайденных событий возвращается `{"found": false, "details": null}`,
+      так же возвращаются события с некорректными данными в БД
+    - Формат `details` совпадает с `/events/{event_id}/details`
+    - В images каждое загруженное изображение представлено всеми вариантами
+      качества: <uuid>_original.jpg, <uuid>_compressed.jpg, <uuid>_thumbnail.jpg
+    """,
+    response_description="Детальная информация о событиях по ключам event_id:date",
+    tags=["События"],
+)
+async def get_event_details_batch(request: EventDetailsBatchRequest):
+    """
+    Получить детальную информацию о нескольких событиях
+    """
+    try:
+        keys = [(item.event_id, item.date) for item in request.items]
+        details = await get_event_details_many(keys)
+
+        result = {}
+        for (event_id, day), entry in details.items():
+            key = f"{event_id}:{day.isoformat()}"
+            if entry is None:
+                result[key] = {"found": False, "details": None}
+            else:
+                # Готовый JSON вставляется в ответ без повторного разбора
+                result[key] = {"found": True, "details": orjson.Fragment(entry.body)}
+
+        return Response(content=orjson.dumps(result), media_type="application/json")
+
+    except HTTPException:
+        raise
+    except asyncpg.exceptions.PostgresError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
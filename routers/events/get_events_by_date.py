@@ -1,9 +1,16 @@
-from fastapi import APIRouter, Query, HTTPException
-from datetime import date, datetime
-from typing import List
+from fastapi import APIRouter, Query, HTTPException, Request
+from datetime import date
+from typing import List, Literal, Optional
 import asyncpg
-import json
-from database import db
+import orjson
+from services.config import settings
+from services.http_cache import json_response
+from .feed import (
+    build_event_filter,
+    get_events_by_date_json,
+    price_sort_key,
+    time_sort_key,
+)
 from .models import EventByDateResponse
 
 
@@ -22,56 +29,71 @@ router = APIRouter()
     - Включает дату, цену, название события, категорию, локацию и путь к изображению
     - Поле img_path может содержать строку с путем к изображению или null
     - Автоматически форматирует даты в ISO-формат
+    - Ответ кэшируется по дате и сбрасывается при изменении событий
+    - Поддерживает ETag / If-None-Match: неизмененная лента возвращает 304
+    - Если БД медленная или недоступна, отдается последняя лента из кэша
+      с заголовком X-Cache-Status: STALE
+    - Фильтры: category_id и location_id (можно несколько), price_min, price_max,
+      free_only; сортировка sort=time или sort=price
+    - Несуществующий category_id или location_id - ошибка 400
+    - Событие без цены считается бесплатным
     """,
     response_description="Список событий с детальной информацией",
     tags=["События"],
 )
 async def get_events_by_date(
+    request: Request,
     search_date: date = Query(
         ...,
         description="Дата в формате YYYY-MM-DD, например: 2023-08-01",
     ),
+    category_id: Optional[List[int]] = Query(None, description="ID категорий события"),
+    location_id: Optional[List[int]] = Query(None, description="ID локаций"),
+    price_min: Optional[int] = Query(None, ge=0, description="Минимальная цена"),
+    price_max: Optional[int] = Query(None, ge=0, description="Максимальная цена"),
+    free_only: bool = Query(False, description="Только бесплатные события"),
+    sort: Optional[Literal["time", "price"]] = Query(
+        None, description="Сортировка: time - по времени, price - по цене"
+    ),
 ):
     """
     Получить события по дате
     """
     try:
-        # Вызываем хранимую процедуру
-        result = await db.execute_procedure("get_events_by_date", search_date)
-
-        # Результат уже в формате JSON, нужно его распарсить
-        if result and len(result) > 0:
-            # Получаем JSON-результат из первого столбца
-            json_result = result[0][0] if result[0] and len(result[0]) > 0 else []
-        else:
-            json_result = []
-
-        # Если результат - строка, то парсим как JSON
-        if isinstance(json_result, str):
-            import json as json_module
-
-            json_result = json_module.loads(json_result)
-
-        # Если результат - None, возвращаем пустой список
-        if json_result is None:
-            json_result = []
-
-        # Конвертируем даты в ISO-формат, если нужно
-        def convert_dates_to_iso(obj):
-            """Рекурсивно преобразует объекты date и datetime в ISO строки"""
-            if isinstance(obj, dict):
-                return {key: convert_dates_to_iso(value) for key, value in obj.items()}
-            elif isinstance(obj, list):
-                return [convert_dates_to_iso(item) for item in obj]
-            elif isinstance(obj, (date, datetime)):
-                return obj.isoformat()
-            else:
-                return obj
-
-        formatted_result = convert_dates_to_iso(json_result)
+        event_filter = await build_event_filter(
+            category_id, location_id, price_min, price_max, free_only
+        )
+        # Лента одинакова для всех пользователей, поэтому отдается из кэша.
+        # Если у клиента та же версия (If-None-Match), БД не запрашивается
+        entry, stale = await get_events_by_date_json(search_date)
+        if not event_filter.active and sort is None:
+            return json_response(
+                request,
+                entry.body,
+                entry.etag,
+                max_age=settings.EVENTS_HTTP_MAX_AGE,
+                stale=stale,
+            )
 
-        return formatted_result
+        # Фильтры и сортировка применяются к ленте из кэша. Для фильтра
+        # по категориям и локациям БД проверяет только ID событий этого дня
+        events = orjson.loads(entry.body)
+        await event_filter.resolve(events)
+        events = event_filter.apply(events)
+        if sort == "time":
+            events.sort(key=time_sort_key)
+        elif sort == "price":
+            events.sort(key=price_sort_key)
+        return json_response(
+            request,
+            orjson.dumps(events),
+            max_age=settings.EVENTS_HTTP_MAX_AGE,
+            stale=stale,
+        )
 
+    except HTTPException:
+        # Перебрасываем HTTPException (404, 503 при перегрузке БД) без изменений
+        raise
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Query, HTTPException, Request
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+import asyncpg
+import base64
+import orjson
+from services.config import settings
+from services.http_cache import json_response
+from .feed import build_event_filter, get_events_for_days, time_sort_key
+from .models import EventRangeResponse
+
+
+router = APIRouter()
+
+# Сколько дней загружается за один запрос к кэшу/БД при заполнении страницы
+DAYS_PER_CHUNK = 7
+
+
+def encode_cursor(day: date, event: dict) -> str:
+    raw = f"{day.isoformat()}|{event['date']}|{event['event_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    """Разбирает курсор в (день ленты, (дата события, ID события))"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        day, event_date, event_id = raw.split("|")
+        return date.fromisoformat(day), (
+            datetime.fromisoformat(event_date),
+            int(event_id),
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Некорректный курсор")
+
+
+@router.get(
+    "/range",
+    response_model=EventRangeResponse,
+    summary="Получить события за период",
+    description="""
+    Этот эндпоинт возвращает события за период с курсорной пагинацией.
+
+    **Особенности:**
+    - События упорядочены по дню, затем по (дата, event_id)
+    - Следующая страница запрашивается по курсору `next_cursor` из ответа,
+      поэтому дальние страницы не дороже первой
+    - Поддерживает те же фильтры, что и `/events/by-date`
+    - Элементы имеют тот же формат, что и в `/events/by-date`
+    """,
+    response_description="Страница событий за период и курсор следующей страницы",
+    tags=["События"],
+)
+async def get_events_by_range(
+    request: Request,
+    from_date: date = Query(
+        ..., alias="from", description="Начало периода, YYYY-MM-DD"
+    ),
+    to_date: date = Query(..., alias="to", description="Конец периода, YYYY-MM-DD"),
+    category_id: Optional[List[int]] = Query(None, description="ID категорий события"),
+    location_id: Optional[List[int]] = Query(None, description="ID локаций"),
+    price_min: Optional[int] = Query(None, ge=0, description="Минимальная цена"),
+    price_max: Optional[int] = Query(None, ge=0, description="Максимальная цена"),
+    free_only: bool = Query(False, description="Только бесплатные события"),
+    limit: int = Query(50, ge=1, le=200, description="Размер страницы"),
+    cursor: Optional[str] = Query(None, description="Курсор из next_cursor"),
+):
+    """
+    Получить события за период
+    """
+    if to_date < from_date:
+        raise HTTPException(status_code=400, detail="Конец периода раньше начала")
+    max_days = settings.EVENTS_RANGE_MAX_DAYS
+    if (to_date - from_date).days >= max_days:
+        raise HTTPException(
+            status_code=400, detail=f"Период не может быть длиннее {max_days} дней"
+        )
+
+    try:
+        event_filter = await build_event_filter(
+            category_id, location_id, price_min, price_max, free_only
+        )
+
+        day = from_date
+        cursor_day = after = None
+        if cursor:
+            cursor_day, after = decode_cursor(cursor)
+            day = max(day, cursor_day)
+
+        # Набираем limit + 1 событий, чтобы понять, есть ли следующая страница
+        page = []
+        while day <= to_date and len(page) <= limit:
+            days = [
+                day + timedelta(days=i)
+                for i in range(min(DAYS_PER_CHUNK, (to_date - day).days + 1))
+            ]
+            feeds = await get_events_for_days(days)
+            chunk = {current: orjson.loads(feeds[current].body) for current in days}
+            await event_filter.resolve(
+                event for events in chunk.values() for event in events
+            )
+            for current in days:
+                events = event_filter.apply(chunk[current])
+                events.sort(key=time_sort_key)
+                for event in events:
+                    # Пропускаем события до курсора включительно
+                    if current == cursor_day and time_sort_key(event) <= after:
+                        continue
+                    page.append((current, event))
+                if len(page) > limit:
+                    break
+            day = days[-1] + timedelta(days=1)
+
+        next_cursor = None
+        if len(page) > limit:
+            page = page[:limit]
+            next_cursor = encode_cursor(*page[-1])
+
+        body = orjson.dumps(
+            {"items": [event for _, event in page], "next_cursor": next_cursor}
+        )
+        return json_response(request, body, max_age=settings.EVENTS_HTTP_MAX_AGE)
+
+    except HTTPException:
+        raise
+    except asyncpg.exceptions.PostgresError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,109 @@
+from fastapi import APIRouter, Query, HTTPException, Request
+from datetime import date
+import calendar
+import asyncpg
+import orjson
+from database import db
+from services.cache import (
+    cache_invalidator,
+    events_calendar_cache,
+    read_from_replica,
+)
+from services.config import settings
+from services.http_cache import CachedBody, json_response
+from .models import EventCalendarResponse
+
+
+router = APIRouter()
+
+# Количество событий по дням и категориям за месяц одним запросом.
+# Чтение диапазона дат идет по индексу:
+#
+#   CREATE INDEX event_schedules_date_idx ON event_schedules (date);
+EVENTS_CALENDAR_QUERY = """
+SELECT s.date::date AS day, c.name AS category_name, count(*) AS events
+FROM event_schedules s
+JOIN events e ON e.id = s.event_id
+JOIN event_categories c ON c.id = e.category_id
+WHERE s.date >= $1 AND s.date < $2
+GROUP BY 1, 2
+"""
+
+
+@router.get(
+    "/calendar",
+    response_model=EventCalendarResponse,
+    summary="Получить количество событий по дням месяца",
+    description="""
+    Этот эндпоинт возвращает количество событий на каждый день месяца для календаря.
+
+    **Особенности:**
+    - `totals` - массив количеств по дням, элемент 0 соответствует 1-му числу
+    - `by_category` - такие же массивы для каждой категории
+    - Счетчики считаются одним агрегирующим запросом по расписанию событий
+      и кэшируются по месяцу
+    - Кэш месяца сбрасывается при создании события в этом месяце
+    """,
+    response_description="Количество событий по дням месяца",
+    tags=["События"],
+)
+async def get_events_calendar(
+    request: Request,
+    year: int = Query(..., ge=2000, le=2100, description="Год"),
+    month: int = Query(..., ge=1, le=12, description="Месяц, 1-12"),
+):
+    """
+    Получить количество событий по дням месяца
+    """
+    try:
+        entry = events_calendar_cache.get((year, month))
+        if entry is None:
+            entry = await _load_calendar(year, month)
+        return json_response(
+            request, entry.body, entry.etag, max_age=settings.EVENTS_HTTP_MAX_AGE
+        )
+
+    except HTTPException:
+        raise
+    except asyncpg.exceptions.PostgresError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+async def _load_calendar(year: int, month: int) -> CachedBody:
+    days_in_month = calendar.monthrange(year, month)[1]
+    start = date(year, month, 1)
+    end = date(year + month // 12, month % 12 + 1, 1)
+    with events_calendar_cache.loading() as generation:
+        rows = await db.fetch(
+            EVENTS_CALENDAR_QUERY,
+            start,
+            end,
+            use_replica=read_from_replica(events_calendar_cache),
+        )
+
+    totals = [0] * days_in_month
+    by_category = {}
+    for row in rows:
+        index = row["day"].day - 1
+        totals[index] += row["events"]
+        counts = by_category.setdefault(row["category_name"], [0] * days_in_month)
+        counts[index] = row["events"]
+
+    entry = CachedBody(
+        orjson.dumps(
+            {"year": year, "month": month, "totals": totals, "by_category": by_category}
+        )
+    )
+    events_calendar_cache.set((year, month), entry, generation=generation)
+    return entry
+
+
+def _on_events_by_date_changed(keys: list):
+    # Ключи - даты в ISO, сбрасываем месяцы, в которые они попадают
+    months = {(int(key[:4]), int(key[5:7])) for key in keys}
+    events_calendar_cache.invalidate(*months)
+
+
+cache_invalidator.subscribe("events_by_date", _on_events_by_date_changed)
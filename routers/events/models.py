@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from datetime import datetime, date
-from typing import Optional, List
+import datetime as dt
+from typing import Dict, Optional, List
 
 
 class EventCategoryRequest(BaseModel):
@@ -60,6 +61,46 @@ class EventByDateResponse(BaseModel):
     model_config = {"from_attributes": True}
 
 
+class EventRangeResponse(BaseModel):
+    items: List[EventByDateResponse]
+    next_cursor: Optional[str] = Field(
+        None, description="Курсор следующей страницы, null если страниц больше нет"
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class EventCalendarResponse(BaseModel):
+    year: int
+    month: int
+    totals: List[int] = Field(
+        ..., description="Количество событий по дням месяца, начиная с 1-го числа"
+    )
+    by_category: Dict[str, List[int]] = Field(
+        ..., description="Количество событий по дням месяца для каждой категории"
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class EventSearchItem(BaseModel):
+    event_id: int
+    title: str
+    snippet: Optional[str] = Field(
+        None, description="Фрагмент описания с найденными словами"
+    )
+    rank: float = Field(..., description="Релевантность, чем больше - тем лучше")
+
+    model_config = {"from_attributes": True}
+
+
+class EventSearchResponse(BaseModel):
+    items: List[EventSearchItem]
+    has_more: bool = Field(..., description="Есть ли следующая страница")
+
+    model_config = {"from_attributes": True}
+
+
 class EventLocationResponse(BaseModel):
     name: str
     category: str
@@ -91,3 +132,28 @@ class EventDetailsFullResponse(BaseModel):
     images: List[str]
 
     model_config = {"from_attributes": True}
+
+
+class EventDetailsKey(BaseModel):
+    event_id: int = Field(..., description="ID события")
+    date: dt.date = Field(..., description="Дата для расписания работы локации")
+
+    model_config = {"from_attributes": True}
+
+
+class EventDetailsBatchRequest(BaseModel):
+    items: List[EventDetailsKey] = Field(
+        ...,
+        min_length=1,
+        max_length=100,
+        description="Пары (event_id, date), максимум 100",
+    )
+
+    model_config = {"from_attributes": True}
+
+
+class EventDetailsBatchItem(BaseModel):
+    found: bool = Field(..., description="Найдено ли событие")
+    details: Optional[EventDetailsFullResponse] = None
+
+    model_config = {"from_attributes": True}
@@ -0,0 +1,105 @@
+from fastapi import APIRouter, Query, HTTPException
+from datetime import date, timedelta
+from typing import Optional
+import asyncpg
+from database import db
+from .models import EventSearchResponse
+
+
+router = APIRouter()
+
+# Выражение поиска должно совпадать с выражением индекса, иначе будет seq scan:
+#
+#   CREATE INDEX events_search_idx ON events USING GIN ((
+#       setweight(to_tsvector('russian', coalesce(title, '')), 'A') ||
+#       setweight(to_tsvector('russian', coalesce(description, '')), 'B')
+#   ));
+#
+# Проверка периода (EXISTS по расписанию) идет по индексу:
+#
+#   CREATE INDEX event_schedules_event_date_idx ON event_schedules (event_id, date);
+EVENT_SEARCH_VECTOR = """
+    setweight(to_tsvector('russian', coalesce(e.title, '')), 'A') ||
+    setweight(to_tsvector('russian', coalesce(e.description, '')), 'B')
+"""
+
+EVENT_SEARCH_QUERY = f"""
+SELECT
+    e.id AS event_id,
+    e.title,
+    ts_headline(
+        'russian', coalesce(e.description, ''), q,
+        'MaxFragments=1, MinWords=5, MaxWords=20'
+    ) AS snippet,
+    ts_rank_cd({EVENT_SEARCH_VECTOR}, q) AS rank
+FROM events e, websearch_to_tsquery('russian', $1) AS q
+WHERE ({EVENT_SEARCH_VECTOR}) @@ q
+    AND ($4::date IS NULL OR EXISTS (
+        SELECT 1 FROM event_schedules s
+        WHERE s.event_id = e.id AND s.date >= $4 AND s.date < $5
+    ))
+ORDER BY rank DESC, e.id
+LIMIT $2 OFFSET $3
+"""
+
+
+@router.get(
+    "/search",
+    response_model=EventSearchResponse,
+    summary="Полнотекстовый поиск событий",
+    description="""
+    Этот эндпоинт ищет события по словам в названии и описании.
+
+    **Особенности:**
+    - Учитывает русскую морфологию: "концерты" находит "концерт"
+    - Поддерживает синтаксис веб-поиска: "фразы в кавычках", -исключение, or
+    - Совпадения в названии ранжируются выше совпадений в описании
+    - Можно ограничить поиск событиями, которые проходят в период from-to
+    - Пагинация через limit/offset, `has_more` показывает наличие следующей страницы
+    """,
+    response_description="Найденные события, отсортированные по релевантности",
+    tags=["События"],
+)
+async def search_events(
+    q: str = Query(..., min_length=2, max_length=200, description="Строка поиска"),
+    from_date: Optional[date] = Query(
+        None, alias="from", description="Начало периода, YYYY-MM-DD"
+    ),
+    to_date: Optional[date] = Query(
+        None, alias="to", description="Конец периода, YYYY-MM-DD"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Размер страницы"),
+    offset: int = Query(0, ge=0, le=10000, description="Смещение"),
+):
+    """
+    Найти события по тексту
+    """
+    if from_date is not None or to_date is not None:
+        from_date = from_date or to_date
+        to_date = to_date or from_date
+        if to_date < from_date:
+            raise HTTPException(status_code=400, detail="Конец периода раньше начала")
+        # Конец периода включительно
+        to_date += timedelta(days=1)
+
+    try:
+        rows = await db.fetch(
+            EVENT_SEARCH_QUERY, q, limit + 1, offset, from_date, to_date
+        )
+        items = [
+            {
+                "event_id": row["event_id"],
+                "title": row["title"],
+                "snippet": row["snippet"] or None,
+                "rank": row["rank"],
+            }
+            for row in rows[:limit]
+        ]
+        return {"items": items, "has_more": len(rows) > limit}
+
+    except HTTPException:
+        raise
+    except asyncpg.exceptions.PostgresError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from database import db
 from services.image_service import ImageService
 from services.config import settings
+from routers.events.feed import invalidate_event
 import asyncpg
 
 
@@ -15,7 +16,7 @@ router = APIRouter()
 @router.delete(
     "/{event_id}/images/{image_id}",
     summary="Удалить изображение события",
-    description="Удаляет указанное изображение события",
+    description="Удаляет изображение события вместе со всеми его вариантами",
     tags=["Изображения событий"],
 )
 async def delete_event_image(
@@ -24,15 +25,36 @@ async def delete_event_image(
     image_service: ImageService = Depends(get_image_service),
 ):
     try:
-        # Вызываем хранимую процедуру для удаления
-        file_path = await db.execute_function("delete_event_image", image_id, event_id)
-
-        if file_path:
-            # Удаляем физический файл
+        async with db.transaction() as tx:
+            # Изображение загружается в нескольких вариантах качества
+            # (<uuid>_<качество>.jpg), удаляются все варианты вместе
+            images = await tx.execute_procedure("get_event_images", event_id)
+            image = next((img for img in images if img["id"] == image_id), None)
+            if image is None:
+                raise HTTPException(status_code=404, detail="Image not found")
+
+            def group_of(img):
+                return image_service.variant_group(
+                    img["file_path"], settings.IMAGE_QUALITIES
+                )[0]
+
+            group = group_of(image)
+            file_paths = []
+            for img in images:
+                if group_of(img) != group:
+                    continue
+                # Вызываем хранимую процедуру для удаления
+                file_path = await tx.execute_function(
+                    "delete_event_image", img["id"], event_id
+                )
+                if file_path:
+                    file_paths.append(file_path)
+
+        # Удаляем физические файлы после фиксации транзакции
+        for file_path in file_paths:
             image_service.delete_image(file_path)
-            return {"message": "Image deleted successfully"}
-        else:
-            raise HTTPException(status_code=404, detail="Image not found")
+        await invalidate_event(event_id)
+        return {"message": "Image deleted successfully"}
 
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
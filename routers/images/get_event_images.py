@@ -2,6 +2,8 @@ from fastapi import APIRouter, HTTPException
 from typing import List
 import asyncpg
 from database import db
+from services.config import settings
+from services.image_service import ImageService
 from .models import ImageResponse
 
 
@@ -11,7 +13,8 @@ router = APIRouter()
 @router.get(
     "/{event_id}/images",
     summary="Получить изображения события",
-    description="Возвращает список всех изображений для указанного события",
+    description="Возвращает изображения события: по одной записи на загрузку, "
+    "ссылки на все варианты качества - в поле variants",
     tags=["Изображения событий"],
 )
 async def get_event_images(event_id: int):
@@ -19,23 +22,41 @@ async def get_event_images(event_id: int):
         # Вызываем хранимую процедуру для получения изображений
         images = await db.execute_procedure("get_event_images", event_id)
 
-        return [
-            {
-                "id": img["id"],
-                "url": f"/static/images/{img['file_path']}",
-                "file_name": img["file_name"],
-                "file_size": img["file_size"],
-                "width": img["width"],
-                "height": img["height"],
-                "image_quality": img["image_quality"],
-                "sort_order": img["sort_order"],
-                "is_primary": img["is_primary"],
-                "created_at": (
-                    img["created_at"].isoformat() if img["created_at"] else None
-                ),
-            }
-            for img in images
-        ]
+        # Одна запись на загрузку: вариант compressed (или единственный),
+        # остальные варианты качества - в поле variants
+        groups = {}
+        for img in images:
+            group, quality = ImageService.variant_group(
+                img["file_path"], settings.IMAGE_QUALITIES
+            )
+            groups.setdefault(group, []).append((quality, img))
+
+        result = []
+        for variants in groups.values():
+            _, img = next(
+                (item for item in variants if item[0] == "compressed"), variants[0]
+            )
+            result.append(
+                {
+                    "id": img["id"],
+                    "url": f"/api/v1/images/{img['file_path']}",
+                    "file_name": img["file_name"],
+                    "file_size": img["file_size"],
+                    "width": img["width"],
+                    "height": img["height"],
+                    "image_quality": img["image_quality"],
+                    "sort_order": img["sort_order"],
+                    "is_primary": any(item["is_primary"] for _, item in variants),
+                    "created_at": (
+                        img["created_at"].isoformat() if img["created_at"] else None
+                    ),
+                    "variants": {
+                        item["image_quality"]: f"/api/v1/images/{item['file_path']}"
+                        for _, item in variants
+                    },
+                }
+            )
+        return result
 
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
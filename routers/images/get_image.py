@@ -0,0 +1,174 @@
+from fastapi import APIRouter, HTTPException, Query, Request, Depends
+from fastapi.responses import FileResponse, Response
+from pathlib import Path
+from typing import Literal, Optional
+import asyncio
+import hashlib
+import mimetypes
+import os
+from services.http_cache import etag_matches
+from services.image_cache import image_cache
+from services.image_pool import image_pool
+from services.image_service import (
+    ImageService,
+    MODERN_FORMATS,
+    accepted_image_types,
+    fit_size,
+    image_size,
+    resize_image,
+    supported_formats,
+)
+from services.single_flight import SingleFlight
+from services.config import settings
+
+
+def get_image_service():
+    return ImageService(settings.IMAGE_UPLOAD_DIR)
+
+
+router = APIRouter()
+
+# Имена файлов содержат UUID и не меняются, кэшировать можно надолго
+IMAGE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+MIME_TYPES = {
+    extension: mime_type for extension, (_, mime_type, _) in MODERN_FORMATS.items()
+}
+
+# Одновременные запросы одного и того же размера уменьшают изображение один раз
+resize_flights = SingleFlight("image_resize")
+
+
+@router.get(
+    "/{file_path:path}",
+    summary="Получить изображение",
+    description="""
+    Этот эндпоинт отдает файл изображения по пути из ответа загрузки
+    или списка изображений события.
+
+    **Особенности:**
+    - Выбирает самый маленький формат, который клиент указал в Accept:
+      AVIF, WebP или исходный JPEG
+    - Ответ содержит Vary: Accept, чтобы кэши хранили версии по форматам
+    - Поддерживает ETag / If-None-Match: неизмененный файл возвращает 304
+    - С параметрами w и/или h отдает уменьшенную копию из самого большого
+      варианта изображения; fit=contain вписывает в размер, fit=cover
+      заполняет его с обрезкой (нужны оба размера)
+    - Изображение не увеличивается: для размеров больше исходника отдается
+      исходник (contain) или кадр с теми же пропорциями в пределах исходника (cover)
+    - Разрешены только размеры из IMAGE_RESIZE_DIMENSIONS, другие - 400
+    - Уменьшенные копии хранятся в дисковом кэше и создаются один раз
+      даже при одновременных запросах
+    """,
+    response_class=FileResponse,
+    tags=["Изображения событий"],
+)
+async def get_image(
+    request: Request,
+    file_path: str,
+    w: Optional[int] = Query(None, description="Ширина в пикселях"),
+    h: Optional[int] = Query(None, description="Высота в пикселях"),
+    fit: Literal["contain", "cover"] = Query(
+        "contain", description="contain - вписать, cover - заполнить с обрезкой"
+    ),
+    image_service: ImageService = Depends(get_image_service),
+):
+    full_path = image_service.resolve(file_path)
+    if (
+        full_path is None
+        or not full_path.is_file()
+        or settings.IMAGE_CACHE_DIR.resolve() in full_path.parents
+    ):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    accept = request.headers.get("accept")
+    if w is None and h is None:
+        path = image_service.negotiate(full_path, accept)
+    else:
+        for value in (w, h):
+            if value is not None and value not in settings.IMAGE_RESIZE_DIMENSIONS:
+                allowed = ", ".join(map(str, sorted(settings.IMAGE_RESIZE_DIMENSIONS)))
+                raise HTTPException(
+                    status_code=400, detail=f"Размер должен быть одним из: {allowed}"
+                )
+        if fit == "cover" and (w is None or h is None):
+            raise HTTPException(
+                status_code=400, detail="Для fit=cover нужны оба размера: w и h"
+            )
+        source = image_service.largest_variant(full_path, settings.IMAGE_QUALITIES)
+        # Изображение не увеличивается: размеры больше исходника сводятся
+        # к нему, и такие запросы делят одну копию в кэше
+        stat = source.stat()
+        size = fit_size(image_size(str(source), stat.st_mtime_ns), (w, h), fit)
+        if size is None:
+            path = image_service.negotiate(source, accept)
+        else:
+            path, etag, body = await _get_resized(source, size, fit, accept)
+            return _image_response(request, path, etag, body)
+
+    stat = path.stat()
+    return _image_response(
+        request, path, f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"', stat=stat
+    )
+
+
+def _image_response(
+    request: Request,
+    path: Path,
+    etag: str,
+    body: bytes = None,
+    stat: os.stat_result = None,
+):
+    """Ответ с файлом изображения или с уже прочитанным содержимым body"""
+    headers = {
+        "Vary": "Accept",
+        "Cache-Control": IMAGE_CACHE_CONTROL,
+        "ETag": etag,
+    }
+    if etag_matches(request.headers.get("if-none-match"), headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    media_type = MIME_TYPES.get(path.suffix) or mimetypes.guess_type(path.name)[0]
+    if body is not None:
+        return Response(body, media_type=media_type, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers, stat_result=stat)
+
+
+async def _get_resized(source: Path, size: tuple, fit: str, accept: Optional[str]):
+    """
+    Уменьшенная копия source из дискового кэша, при промахе - создает ее.
+    Возвращает (путь, ETag, содержимое): копия читается целиком, поэтому
+    вытеснение файла после чтения ответу не мешает
+    """
+    accepted = accepted_image_types(accept)
+    extension = next(
+        (ext for ext in supported_formats() if MIME_TYPES[ext] in accepted), ".jpg"
+    )
+    # Время изменения исходника в ключе: новый файл - новая копия
+    stat = source.stat()
+    key = f"{source}|{stat.st_mtime_ns}|{size[0]}|{size[1]}|{fit}"
+    name = hashlib.blake2b(key.encode(), digest_size=16).hexdigest() + extension
+    # Имя определяет содержимое, а mtime файла в кэше меняется при каждом
+    # попадании (LRU), поэтому ETag строится по имени
+    etag = f'"{Path(name).stem}"'
+
+    async def render():
+        target = image_cache.path(name)
+        file_size = await image_pool.run(
+            resize_image, str(source), str(target), size, fit
+        )
+        # Читаем до учета в кэше: add() может запустить вытеснение
+        body = await asyncio.to_thread(target.read_bytes)
+        await image_cache.add(name, file_size)
+        return target, etag, body
+
+    path = await image_cache.get(name)
+    if path is not None:
+        try:
+            return path, etag, await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            # Файл вытеснен из кэша другим запросом или воркером
+            # после проверки - считаем это промахом
+            pass
+
+    return await resize_flights.do(name, render)
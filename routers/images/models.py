@@ -1,6 +1,6 @@
 from pydantic import BaseModel, Field
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 
 class ImageResponse(BaseModel):
@@ -15,5 +15,6 @@ class ImageResponse(BaseModel):
     sort_order: Optional[int] = 0
     is_primary: Optional[bool] = False
     created_at: Optional[datetime] = None
+    variants: Optional[Dict[str, str]] = None
 
     model_config = {"from_attributes": True}
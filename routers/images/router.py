@@ -2,11 +2,15 @@ from fastapi import APIRouter
 from .upload_event_image import router as upload_event_image_router
 from .get_event_images import router as get_event_images_router
 from .delete_event_image import router as delete_event_image_router
+from .get_image import router as get_image_router
 
 
-router = APIRouter(prefix="/api/v1/events")
+router = APIRouter(prefix="/api/v1")
 
-# Подключаем все роутеры для изображений
-router.include_router(upload_event_image_router)
-router.include_router(get_event_images_router)
-router.include_router(delete_event_image_router)
+# Подключаем все роутеры для изображений событий
+router.include_router(upload_event_image_router, prefix="/events")
+router.include_router(get_event_images_router, prefix="/events")
+router.include_router(delete_event_image_router, prefix="/events")
+
+# Отдача файлов изображений с выбором формата
+router.include_router(get_image_router, prefix="/images")
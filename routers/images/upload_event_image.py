@@ -1,7 +1,15 @@
 from fastapi import APIRouter, HTTPException, UploadFile, File, Depends
 from database import db
-from services.image_service import ImageService
+from PIL import Image
+from services.image_service import (
+    ImageService,
+    probe_image,
+    render_variants,
+    sniff_image_type,
+)
+from services.image_pool import image_pool
 from services.config import settings
+from routers.events.feed import invalidate_event
 import asyncpg
 from .models import ImageResponse
 
@@ -13,6 +21,9 @@ def get_image_service():
 
 router = APIRouter()
 
+# Размер части при чтении загружаемого файла
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
 
 @router.post(
     "/{event_id}/images/{is_primary}",
@@ -26,61 +37,125 @@ async def upload_event_image(
     file: UploadFile = File(...),
     image_service: ImageService = Depends(get_image_service),
 ):
-    # Валидация
-    if file.content_type not in settings.ALLOWED_MIME_TYPES:
-        raise HTTPException(400, "Invalid image type")
+    # Лимит одновременных загрузок: файл и его обработка держат память
+    async with image_pool.upload_slot():
+        return await _upload_event_image(event_id, is_primary, file, image_service)
 
-    # Чтение файла
-    image_data = await file.read()
-    if len(image_data) > settings.MAX_IMAGE_SIZE:
-        raise HTTPException(400, "File too large")
 
-    # Генерация пути
-    file_extension = (
-        file.filename.split(".")[-1].lower() if "." in file.filename else ".jpg"
-    )
-    file_path = image_service.generate_file_path(event_id, f".{file_extension}")
+async def _read_upload(file: UploadFile) -> bytes:
+    """
+    Читает загруженный файл частями. Прерывает чтение, как только файл
+    превысил MAX_IMAGE_SIZE или первые байты не похожи на изображение
+    разрешенного формата (content_type и расширение от клиента не проверяются).
+    """
+    data = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        if not data and sniff_image_type(chunk) not in settings.ALLOWED_MIME_TYPES:
+            raise HTTPException(400, "Invalid image type")
+        data += chunk
+        if len(data) > settings.MAX_IMAGE_SIZE:
+            raise HTTPException(400, "File too large")
+    if not data:
+        raise HTTPException(400, "Invalid image type")
+    return bytes(data)
 
-    # Создание сжатой версии
-    compressed_data = image_service.compress_image(
-        image_data, "compressed", settings.IMAGE_QUALITIES["compressed"]
-    )
 
-    # Получаем размеры изображения
-    from PIL import Image
-    import io
+async def _upload_event_image(
+    event_id: int, is_primary: bool, file: UploadFile, image_service: ImageService
+):
+    # Чтение файла частями: размер и формат проверяются по ходу чтения
+    image_data = await _read_upload(file)
 
-    image = Image.open(io.BytesIO(compressed_data))
-    width, height = image.size
+    # Размеры из заголовка, до выделения памяти под пиксели
+    try:
+        width, height = probe_image(image_data)
+    except (OSError, ValueError, SyntaxError, Image.DecompressionBombError):
+        raise HTTPException(400, "Invalid image")
+    if width * height > settings.IMAGE_MAX_PIXELS:
+        raise HTTPException(400, "Image dimensions too large")
 
+    # Все варианты из IMAGE_QUALITIES за одно декодирование в пуле процессов,
+    # event loop не блокируется
     try:
-        # Сохранение в БД через хранимую процедуру
-        image_id = await db.execute_function(
-            "insert_event_image",
-            event_id,
-            file_path,
-            "image/jpeg",  # Все конвертируем в JPEG
-            file.filename,
-            len(compressed_data),
-            width,
-            height,
-            "compressed",
-            0,  # sort_order
-            is_primary,
+        variants = await image_pool.run(
+            render_variants, image_data, settings.IMAGE_QUALITIES
         )
+    except (OSError, ValueError, SyntaxError):
+        # Заголовок корректный, но данные повреждены
+        raise HTTPException(400, "Invalid image")
 
-        # Сохраняем файл на диск только после успешного сохранения в БД
-        image_service.save_image(file_path, compressed_data)
-
-        return {
-            "id": image_id,
-            "url": f"/static/images/{file_path}",
-            "file_name": file.filename,
-            "file_size": len(compressed_data),
-            "width": width,
-            "height": height,
-            "event_id": event_id,
-        }
+    # Пути вариантов с общим UUID, все конвертируются в JPEG
+    file_paths = image_service.generate_variant_paths(
+        event_id, [quality for quality, *_ in variants], ".jpg"
+    )
+
+    # Основной вариант, который отдается в ответе и помечается is_primary
+    main_quality = "compressed" if "compressed" in file_paths else variants[0][0]
+
+    saved = []
+    try:
+        try:
+            async with db.transaction() as tx:
+                images = []
+                for quality, width, height, encodings in variants:
+                    data = encodings[".jpg"]
+                    file_path = file_paths[quality]
+                    # Сохранение в БД через хранимую процедуру
+                    image_id = await tx.execute_function(
+                        "insert_event_image",
+                        event_id,
+                        file_path,
+                        "image/jpeg",  # Все конвертируем в JPEG
+                        file.filename,
+                        len(data),
+                        width,
+                        height,
+                        quality,
+                        0,  # sort_order
+                        is_primary and quality == main_quality,
+                    )
+
+                    # Сохраняем файл на диск внутри транзакции:
+                    # если запись файла не удалась, записи в БД откатываются
+                    image_service.save_image(file_path, data)
+                    saved.append(file_path)
+                    # WebP/AVIF рядом с JPEG, выбираются по Accept в /images
+                    for extension, encoded in encodings.items():
+                        if extension != ".jpg":
+                            image_service.save_image(
+                                image_service.with_extension(file_path, extension),
+                                encoded,
+                            )
+                    images.append(
+                        {
+                            "id": image_id,
+                            "url": f"/api/v1/images/{file_path}",
+                            "file_name": file.filename,
+                            "file_size": len(data),
+                            "width": width,
+                            "height": height,
+                            "event_id": event_id,
+                            "image_quality": quality,
+                            "is_primary": is_primary and quality == main_quality,
+                        }
+                    )
+        except Exception:
+            # Транзакция откатилась, файлы уже сохраненных вариантов не нужны
+            for file_path in saved:
+                image_service.delete_image(file_path)
+            raise
+
+        # Изображение события попадает в ленту, сбрасываем ее кэш
+        await invalidate_event(event_id)
+
+        # Основной ответ - вариант compressed, как и раньше, плюс все варианты
+        main = next(
+            image for image in images if image["image_quality"] == main_quality
+        )
+        return {**main, "variants": images}
 
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
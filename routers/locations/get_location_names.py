@@ -1,7 +1,9 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request
 from typing import List
 import asyncpg
-from database import db
+from services.config import settings
+from services.reference_data import reference_data
+from services.http_cache import json_response
 from .models import LocationNameResponse
 
 
@@ -16,22 +18,20 @@ router = APIRouter()
     response_description="Список ID и названий локаций",
     tags=["Локации"],
 )
-async def get_location_names():
+async def get_location_names(request: Request):
     """
     Получить ID и названия всех локаций
     """
     try:
-        # Запрос для получения ID и названий локаций
-        query = "SELECT id, name FROM locations ORDER BY name"
-        result = await db.fetch(query)
-
-        # Преобразуем результат в список словарей для совместимости с Pydantic
-        locations = []
-        for record in result:
-            locations.append({"id": record["id"], "name": record["name"]})
-
-        return locations
+        # Справочник хранится в памяти в виде готового отсортированного JSON
+        entry = await reference_data.locations.get_json()
+        return json_response(
+            request, entry.body, entry.etag, max_age=settings.REFERENCE_HTTP_MAX_AGE
+        )
 
+    except HTTPException:
+        # Перебрасываем HTTPException (404, 503 при перегрузке БД) без изменений
+        raise
     except asyncpg.exceptions.PostgresError as e:
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
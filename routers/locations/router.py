@@ -1,8 +1,10 @@
 from fastapi import APIRouter
 from .get_location_names import router as get_location_names_router
+from .search_locations import router as search_locations_router
 
 
 router = APIRouter(prefix="/api/v1/locations")
 
-# Подключаем роутер для локаций
+# Подключаем роутеры для локаций
 router.include_router(get_location_names_router)
+router.include_router(search_locations_router)
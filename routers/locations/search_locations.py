@@ -0,0 +1,44 @@
+from fastapi import APIRouter, HTTPException, Query
+from typing import List
+import asyncpg
+from services.location_search import location_search_index
+from services.reference_data import reference_data
+from .models import LocationNameResponse
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/search",
+    response_model=List[LocationNameResponse],
+    summary="Поиск локаций по названию",
+    description="""
+    Этот эндпоинт возвращает локации, названия которых подходят под строку поиска.
+
+    **Особенности:**
+    - Ищет по началу названия и по началу любого слова в названии
+    - Не учитывает регистр, буквы "ё" и "е" считаются одинаковыми
+    - Если точных совпадений мало, добавляет похожие названия (опечатки)
+    - Поиск идет по индексу в памяти, без запросов к БД
+    """,
+    response_description="Список ID и названий подходящих локаций",
+    tags=["Локации"],
+)
+async def search_locations(
+    q: str = Query(..., min_length=1, max_length=100, description="Строка поиска"),
+    limit: int = Query(10, ge=1, le=50, description="Максимум результатов"),
+):
+    """
+    Найти локации по названию
+    """
+    try:
+        await reference_data.locations.ensure_loaded()
+        return location_search_index.search(q, limit)
+
+    except HTTPException:
+        raise
+    except asyncpg.exceptions.PostgresError as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
@@ -0,0 +1,30 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from services.metrics import metrics
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    summary="Метрики в формате Prometheus",
+    description="""
+    Этот эндпоинт возвращает метрики процесса в текстовом формате Prometheus.
+
+    **Особенности:**
+    - Гистограмма времени ожидания соединения из пула
+    - Количество занятых и свободных соединений пула
+    - Время выполнения и количество ошибок по каждой процедуре
+    - Метрики собираются отдельно в каждом воркере uvicorn
+    """,
+    include_in_schema=False,
+)
+async def get_metrics():
+    """
+    Получить метрики процесса
+    """
+    return PlainTextResponse(
+        metrics.render(), media_type="text/plain; version=0.0.4"
+    )
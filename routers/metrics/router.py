@@ -0,0 +1,8 @@
+from fastapi import APIRouter
+from .get_metrics import router as get_metrics_router
+
+
+router = APIRouter()
+
+# Подключаем роутер метрик
+router.include_router(get_metrics_router)
@@ -0,0 +1,420 @@
+import time
+import uuid
+import logging
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Iterable, Optional, Tuple
+import orjson
+from database import db
+from services.config import settings
+from services.metrics import metrics
+from services.single_flight import SingleFlight
+
+
+# Канал LISTEN/NOTIFY для инвалидации кэшей во всех воркерах
+INVALIDATION_CHANNEL = "mestio_cache_invalidation"
+
+
+CACHE_REQUESTS = metrics.counter(
+    "cache_requests_total", "Обращения к кэшу: hit или miss", ("cache", "result")
+)
+CACHE_EVICTIONS = metrics.counter(
+    "cache_evictions_total", "Записи, вытесненные из кэша по объему", ("cache",)
+)
+CACHE_INVALIDATIONS = metrics.counter(
+    "cache_invalidations_total",
+    "Записи, удаленные из кэша при изменении данных",
+    ("cache",),
+)
+CACHE_STALE_RESPONSES = metrics.counter(
+    "cache_stale_responses_total",
+    "Устаревшие записи, отданные из кэша: revalidate - обновляется в фоне, "
+    "error - БД недоступна",
+    ("cache", "reason"),
+)
+CACHE_SIZE = metrics.gauge(
+    "cache_size", "Размер кэша: записи и байты", ("cache", "unit")
+)
+
+
+class CacheEntry:
+    __slots__ = ("value", "size", "expires_at", "tags")
+
+    def __init__(self, value: Any, size: int, expires_at: float, tags: tuple):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class TTLCache:
+    """
+    LRU-кэш в памяти процесса с TTL и ограничением по объему.
+
+    Значения обычно - готовые байты ответа, их размер учитывается
+    в max_bytes. Записи можно помечать тегами (например, event:14),
+    чтобы удалять сразу все записи, которые зависят от одного события.
+
+    Если задан stale_while_revalidate или stale_if_error, записи хранятся
+    и после TTL: get() их уже не отдает, а lookup() отдает вместе с
+    возрастом, чтобы можно было ответить устаревшими данными
+    (см. get_or_load). Инвалидация удаляет записи сразу.
+
+    Загрузки из источника выполняются внутри loading(): если ключ или тег
+    инвалидированы, пока загрузка шла, set() с ее поколением ничего
+    не сохраняет - значение могло быть прочитано до изменения.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_bytes: int,
+        stale_while_revalidate: float = 0,
+        stale_if_error: float = 0,
+    ):
+        self.name = name
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        # Сколько запись хранится после TTL
+        self.grace = max(stale_while_revalidate, stale_if_error)
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._tags = {}
+        self._lock = threading.Lock()
+        # Номер поколения растет при каждой инвалидации. Пока идут загрузки,
+        # для ключей ("key", ключ) и тегов ("tag", тег) запоминается номер
+        # их последней инвалидации
+        self.generation = 0
+        self.invalidated_at = float("-inf")
+        self._cleared = 0
+        self._invalidations = OrderedDict()
+        self._loads = {}
+        _caches.append(self)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key) -> Optional[Any]:
+        value, age = self.lookup(key)
+        return value if age <= 0 else None
+
+    def lookup(self, key) -> Tuple[Optional[Any], float]:
+        """
+        Возвращает (значение, сколько секунд назад истек TTL).
+        Для свежей записи возраст не больше 0, для отсутствующей - (None, 0).
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            age = 0
+            if entry is not None:
+                age = time.monotonic() - entry.expires_at
+                if age > self.grace:
+                    self._remove(key)
+                    entry = None
+            if entry is None or age > 0:
+                self.misses += 1
+                CACHE_REQUESTS.inc(cache=self.name, result="miss")
+                if entry is None:
+                    return None, 0
+                return entry.value, age
+            self._entries.move_to_end(key)
+            self.hits += 1
+            CACHE_REQUESTS.inc(cache=self.name, result="hit")
+            return entry.value, age
+
+    def set(
+        self,
+        key,
+        value: Any,
+        tags: Iterable[str] = (),
+        size: int = None,
+        generation: int = None,
+    ):
+        """
+        Сохраняет значение. generation - номер из loading(): если ключ или
+        один из тегов с тех пор инвалидированы, значение не сохраняется.
+        """
+        if size is None:
+            size = len(value)
+        if size > self.max_bytes:
+            return
+        tags = tuple(tags)
+        with self._lock:
+            if generation is not None and self._changed_since(generation, key, tags):
+                return
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = CacheEntry(
+                value, size, time.monotonic() + self.ttl, tags
+            )
+            self.bytes += size
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            # Вытесняем самые давно использованные записи
+            while self.bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                CACHE_EVICTIONS.inc(cache=self.name)
+
+    def invalidate(self, *keys):
+        with self._lock:
+            self._next_generation()
+            for key in keys:
+                self._mark(("key", key))
+                if key in self._entries:
+                    self._remove(key)
+                    CACHE_INVALIDATIONS.inc(cache=self.name)
+
+    def invalidate_tag(self, *tags: str):
+        with self._lock:
+            self._next_generation()
+            for tag in tags:
+                self._mark(("tag", tag))
+                for key in list(self._tags.get(tag, ())):
+                    self._remove(key)
+                    CACHE_INVALIDATIONS.inc(cache=self.name)
+
+    def clear(self):
+        with self._lock:
+            self._cleared = self._next_generation()
+            self._entries.clear()
+            self._tags.clear()
+            self.bytes = 0
+
+    @contextmanager
+    def loading(self):
+        """
+        Отмечает загрузку значений из источника и возвращает номер
+        поколения, который передается в set()
+        """
+        with self._lock:
+            generation = self.generation
+            self._loads[generation] = self._loads.get(generation, 0) + 1
+        try:
+            yield generation
+        finally:
+            with self._lock:
+                self._loads[generation] -= 1
+                if not self._loads[generation]:
+                    del self._loads[generation]
+                # Отметки не новее самой старой незавершенной загрузки не нужны
+                oldest = min(self._loads, default=self.generation)
+                while self._invalidations:
+                    name = next(iter(self._invalidations))
+                    if self._invalidations[name] > oldest:
+                        break
+                    del self._invalidations[name]
+
+    def invalidated_within(self, seconds: float) -> bool:
+        """Была ли инвалидация за последние seconds секунд"""
+        return time.monotonic() - self.invalidated_at < seconds
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _next_generation(self) -> int:
+        self.generation += 1
+        self.invalidated_at = time.monotonic()
+        return self.generation
+
+    def _mark(self, name: tuple):
+        # Без незавершенных загрузок отметки проверять некому
+        if self._loads:
+            self._invalidations[name] = self.generation
+            self._invalidations.move_to_end(name)
+
+    def _changed_since(self, generation: int, key, tags: tuple) -> bool:
+        if self._cleared > generation:
+            return True
+        if self._invalidations.get(("key", key), 0) > generation:
+            return True
+        return any(
+            self._invalidations.get(("tag", tag), 0) > generation for tag in tags
+        )
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        self.bytes -= entry.size
+        for tag in entry.tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+
+_caches = []
+
+
+def _cache_size_samples():
+    samples = []
+    for cache in _caches:
+        samples.append(({"cache": cache.name, "unit": "entries"}, len(cache)))
+        samples.append(({"cache": cache.name, "unit": "bytes"}, cache.bytes))
+    return samples
+
+
+CACHE_SIZE.set_function(_cache_size_samples)
+
+
+class CacheInvalidator:
+    """
+    Инвалидация кэшей во всех воркерах через LISTEN/NOTIFY.
+
+    Каждый кэш подписывает обработчик на свою область (scope), например
+    "event" с ключами - ID событий. publish() сразу применяет изменения
+    в текущем процессе и рассылает уведомление остальным:
+    {"scope": "event", "keys": [14], "source": "<ID процесса>"}.
+    Такие же уведомления могут отправлять триггеры в самой БД.
+    """
+
+    def __init__(self):
+        self.source = uuid.uuid4().hex
+        self._handlers = {}
+        self._reset_handlers = []
+
+    def subscribe(self, scope: str, handler):
+        """Регистрирует handler(keys: list) для области scope"""
+        self._handlers.setdefault(scope, []).append(handler)
+
+    def on_reset(self, handler):
+        """Регистрирует handler() для сброса данных, которые не хранятся в TTLCache"""
+        self._reset_handlers.append(handler)
+
+    def apply(self, scope: str, keys: list):
+        for handler in self._handlers.get(scope, ()):
+            handler(keys)
+
+    def handle_notification(self, payload: str):
+        message = orjson.loads(payload)
+        # Свои уведомления уже применены в publish()
+        if message.get("source") == self.source:
+            return
+        self.apply(message["scope"], message.get("keys", []))
+
+    def reset(self):
+        """Очищает все кэши: уведомления за время разрыва соединения потеряны"""
+        logging.info("Clearing all caches after notification listener reconnect")
+        for cache in _caches:
+            cache.clear()
+        for handler in self._reset_handlers:
+            handler()
+
+    async def publish(self, scope: str, *keys):
+        keys = list(keys)
+        self.apply(scope, keys)
+        payload = orjson.dumps(
+            {"scope": scope, "keys": keys, "source": self.source}
+        ).decode()
+        await db.notify(INVALIDATION_CHANNEL, payload)
+
+
+cache_invalidator = CacheInvalidator()
+db.listen(
+    INVALIDATION_CHANNEL,
+    cache_invalidator.handle_notification,
+    on_reconnect=cache_invalidator.reset,
+)
+
+
+# Загрузки в кэш: одновременные промахи и фоновые обновления одного ключа
+# выполняются одним запросом
+cache_loads = SingleFlight("cache")
+
+
+def read_from_replica(cache: TTLCache) -> bool:
+    """
+    Можно ли загружать значения для cache с реплики. Реплика отстает
+    до replica_max_lag секунд, а проверяется раз в replica_check_interval,
+    поэтому сразу после инвалидации она может еще не содержать изменение -
+    в это время загрузки идут на основной сервер.
+    """
+    return not cache.invalidated_within(
+        db.replica_max_lag + db.replica_check_interval
+    )
+
+
+async def get_or_load(
+    cache: TTLCache,
+    key,
+    load: Callable[[bool], Awaitable[Tuple[Any, Iterable[str]]]],
+) -> Tuple[Optional[Any], bool]:
+    """
+    Возвращает (значение, устарело ли оно). load(use_replica) загружает
+    значение из источника и возвращает (значение, теги), значение
+    сохраняется в кэш, если оно не None.
+
+    - Свежая запись отдается сразу.
+    - Запись, у которой TTL истек не больше stale_while_revalidate секунд
+      назад, тоже отдается сразу, а load() запускается в фоне.
+    - Иначе вызывается load(). Если он упал, а запись истекла не больше
+      stale_if_error секунд назад, отдается она, ошибка только логируется.
+
+    Загрузка, начатая до инвалидации, не сохраняет результат, а новые
+    запросы к ней не присоединяются и загружают значение заново.
+    """
+    value, age = cache.lookup(key)
+    if value is not None and age <= 0:
+        return value, False
+
+    async def refresh():
+        try:
+            with cache.loading() as generation:
+                loaded, tags = await load(read_from_replica(cache))
+                if loaded is not None:
+                    cache.set(key, loaded, tags, generation=generation)
+                return loaded
+        except Exception as e:
+            logging.warning(f"Cache {cache.name} refresh failed for {key}: {str(e)}")
+            raise
+
+    flight = (cache.name, key, cache.generation)
+    if value is not None and age <= cache.stale_while_revalidate:
+        cache_loads.start(flight, refresh)
+        CACHE_STALE_RESPONSES.inc(cache=cache.name, reason="revalidate")
+        return value, True
+
+    try:
+        return await cache_loads.do(flight, refresh), False
+    except Exception:
+        if value is None or age > cache.stale_if_error:
+            raise
+        CACHE_STALE_RESPONSES.inc(cache=cache.name, reason="error")
+        return value, True
+
+
+# Кэш ленты событий по дате: ключ - дата в ISO, значение - готовый JSON
+events_by_date_cache = TTLCache(
+    "events_by_date",
+    ttl=settings.EVENTS_BY_DATE_CACHE_TTL,
+    max_bytes=settings.EVENTS_BY_DATE_CACHE_MAX_BYTES,
+    stale_while_revalidate=settings.EVENTS_STALE_WHILE_REVALIDATE,
+    stale_if_error=settings.EVENTS_STALE_IF_ERROR,
+)
+
+# Кэш деталей событий: ключ - (event_id, день недели), значение - готовый JSON
+event_details_cache = TTLCache(
+    "event_details",
+    ttl=settings.EVENT_DETAILS_CACHE_TTL,
+    max_bytes=settings.EVENT_DETAILS_CACHE_MAX_BYTES,
+    stale_while_revalidate=settings.EVENTS_STALE_WHILE_REVALIDATE,
+    stale_if_error=settings.EVENTS_STALE_IF_ERROR,
+)
+
+# Кэш календаря: ключ - (год, месяц), значение - готовый JSON
+events_calendar_cache = TTLCache(
+    "events_calendar",
+    ttl=settings.EVENTS_BY_DATE_CACHE_TTL,
+    max_bytes=settings.EVENTS_CALENDAR_CACHE_MAX_BYTES,
+)
@@ -6,11 +6,82 @@ class Settings:
     IMAGE_UPLOAD_DIR = Path(os.getenv("IMAGE_UPLOAD_DIR", "uploads/images"))
     MAX_IMAGE_SIZE = 2 * 1024 * 1024  # 2MB
     ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/webp"}
+    # Максимум пикселей исходного изображения, проверяется до декодирования
+    IMAGE_MAX_PIXELS = int(os.getenv("IMAGE_MAX_PIXELS", str(25_000_000)))
     IMAGE_QUALITIES = {
         "original": (1200, 1200),
         "compressed": (800, 800),
         "thumbnail": (300, 300),
     }
+    # Размеры (ширина или высота в пикселях), разрешенные для /images?w=&h=
+    IMAGE_RESIZE_DIMENSIONS = frozenset(
+        int(value)
+        for value in os.getenv(
+            "IMAGE_RESIZE_DIMENSIONS", "160,240,320,480,640,960,1280,1600,1920"
+        ).split(",")
+    )
+    # Дисковый кэш изображений, уменьшенных по запросу
+    IMAGE_CACHE_DIR = IMAGE_UPLOAD_DIR / "cache"
+    IMAGE_CACHE_MAX_BYTES = int(
+        os.getenv("IMAGE_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+    )
+    # Процессы для обработки изображений на воркер uvicorn. Пул создается
+    # в каждом воркере, поэтому по умолчанию ядра делятся между воркерами
+    # (WEB_CONCURRENCY, как у uvicorn --workers): всего процессов - по числу
+    # ядер. Явное IMAGE_WORKERS задает число на воркер, а не на сервер
+    IMAGE_WORKERS = int(
+        os.getenv(
+            "IMAGE_WORKERS",
+            str(
+                max(1, (os.cpu_count() or 1) // int(os.getenv("WEB_CONCURRENCY", "1")))
+            ),
+        )
+    )
+    # Одновременные загрузки изображений на воркер, сверх лимита - 503
+    IMAGE_MAX_CONCURRENT_UPLOADS = int(
+        os.getenv("IMAGE_MAX_CONCURRENT_UPLOADS", str(IMAGE_WORKERS * 4))
+    )
+    # Отдавать JSON из хранимых процедур клиенту без декодирования и валидации
+    JSON_PASSTHROUGH = os.getenv("JSON_PASSTHROUGH", "false").lower() == "true"
+    # Валидировать ответы Pydantic-моделями и в режиме JSON_PASSTHROUGH (для отладки)
+    STRICT_RESPONSE_VALIDATION = (
+        os.getenv("STRICT_RESPONSE_VALIDATION", "false").lower() == "true"
+    )
+    # Cache-Control max-age для ленты и деталей событий
+    EVENTS_HTTP_MAX_AGE = int(os.getenv("EVENTS_HTTP_MAX_AGE", "30"))
+    # Cache-Control max-age для справочников (категории, локации)
+    REFERENCE_HTTP_MAX_AGE = int(os.getenv("REFERENCE_HTTP_MAX_AGE", "300"))
+    # Через сколько секунд справочник перечитывается в фоне при обращении,
+    # даже если уведомлений об изменении не было
+    REFERENCE_DATA_TTL = float(os.getenv("REFERENCE_DATA_TTL", "300"))
+    # Не чаще раза в столько секунд справочник перечитывается из-за
+    # обращения к несуществующему ID
+    REFERENCE_MISS_REFRESH_INTERVAL = float(
+        os.getenv("REFERENCE_MISS_REFRESH_INTERVAL", "5")
+    )
+    # Максимальная длина периода для /events/range, в днях
+    EVENTS_RANGE_MAX_DAYS = int(os.getenv("EVENTS_RANGE_MAX_DAYS", "62"))
+    # Кэш ленты событий по дате
+    EVENTS_BY_DATE_CACHE_TTL = float(os.getenv("EVENTS_BY_DATE_CACHE_TTL", "30"))
+    EVENTS_BY_DATE_CACHE_MAX_BYTES = int(
+        os.getenv("EVENTS_BY_DATE_CACHE_MAX_BYTES", str(32 * 1024 * 1024))
+    )
+    # Сколько секунд после TTL запись ленты или деталей еще отдается сразу,
+    # а обновляется в фоне (stale-while-revalidate)
+    EVENTS_STALE_WHILE_REVALIDATE = float(
+        os.getenv("EVENTS_STALE_WHILE_REVALIDATE", "30")
+    )
+    # Сколько секунд после TTL запись отдается, если БД недоступна (stale-if-error)
+    EVENTS_STALE_IF_ERROR = float(os.getenv("EVENTS_STALE_IF_ERROR", "600"))
+    # Кэш календаря по (год, месяц), TTL как у ленты
+    EVENTS_CALENDAR_CACHE_MAX_BYTES = int(
+        os.getenv("EVENTS_CALENDAR_CACHE_MAX_BYTES", str(1024 * 1024))
+    )
+    # Кэш деталей событий по (event_id, день недели)
+    EVENT_DETAILS_CACHE_TTL = float(os.getenv("EVENT_DETAILS_CACHE_TTL", "300"))
+    EVENT_DETAILS_CACHE_MAX_BYTES = int(
+        os.getenv("EVENT_DETAILS_CACHE_MAX_BYTES", str(16 * 1024 * 1024))
+    )
 
 
 settings = Settings()
@@ -0,0 +1,61 @@
+import hashlib
+from typing import Optional
+from fastapi import Request, Response
+
+
+class CachedBody:
+    """Готовое тело JSON-ответа вместе с его ETag"""
+
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes, etag: Optional[str] = None):
+        self.body = body
+        self.etag = etag or compute_etag(body)
+
+    def __len__(self):
+        return len(self.body)
+
+
+def compute_etag(body: bytes) -> str:
+    """Сильный ETag по содержимому ответа"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Проверяет If-None-Match (слабое сравнение, как требует RFC 9110)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def json_response(
+    request: Request,
+    body: bytes,
+    etag: Optional[str] = None,
+    max_age: int = 0,
+    stale: bool = False,
+) -> Response:
+    """
+    Отдает готовый JSON с ETag и Cache-Control.
+    Если у клиента актуальная версия, возвращает 304 без тела.
+    Устаревшие данные помечаются заголовком X-Cache-Status: STALE
+    и не кэшируются клиентом.
+    """
+    if etag is None:
+        etag = compute_etag(body)
+    if stale:
+        max_age = 0
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={max_age}"}
+    if stale:
+        headers["X-Cache-Status"] = "STALE"
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Optional, Tuple
+from services.config import settings
+from services.metrics import metrics
+
+
+IMAGE_CACHE_REQUESTS = metrics.counter(
+    "image_cache_requests_total",
+    "Обращения к дисковому кэшу изображений: hit или miss",
+    ("result",),
+)
+IMAGE_CACHE_EVICTIONS = metrics.counter(
+    "image_cache_evictions_total", "Файлы, удаленные из дискового кэша по объему"
+)
+IMAGE_CACHE_SIZE = metrics.gauge(
+    "image_cache_size", "Размер дискового кэша изображений: файлы и байты", ("unit",)
+)
+
+# Временный файл старше этого возраста остался от упавшего процесса
+STALE_TEMPORARY_SECONDS = 600
+
+
+class DiskCache:
+    """
+    LRU-кэш файлов в каталоге с ограничением общего объема.
+
+    Файлы пишет вызывающий код (атомарно, через временный *.tmp), кэш
+    учитывает их и удаляет самые давно использованные, когда объем
+    превышает max_bytes. Порядок использования хранится в mtime файлов
+    (при попадании файл "трогается"), а объем считается сканированием
+    каталога, поэтому ограничение общее для всех воркеров, которые
+    пишут в каталог.
+
+    Каталог сканируется, когда оценка объема превысила max_bytes или
+    прошло rescan_interval секунд с прошлого сканирования; удаление
+    идет до low_watermark от max_bytes, чтобы не сканировать на каждой
+    записи. Сканирование и удаление выполняются в пуле потоков, после
+    записи - в фоне, не задерживая ответ.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int,
+        rescan_interval: float = 60,
+        low_watermark: float = 0.9,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.rescan_interval = rescan_interval
+        self.low_watermark = low_watermark
+        self.bytes = 0
+        self.files = 0
+        self._scanned_at = None
+        self._scan_lock = asyncio.Lock()
+        self._scan_task = None
+
+    def path(self, name: str) -> Path:
+        return self.directory / name
+
+    async def get(self, name: str) -> Optional[Path]:
+        """Путь к файлу из кэша или None"""
+        await self._ensure_scanned()
+        path = self.path(name)
+        try:
+            # Отмечаем использование для LRU
+            os.utime(path)
+        except FileNotFoundError:
+            IMAGE_CACHE_REQUESTS.inc(result="miss")
+            return None
+        IMAGE_CACHE_REQUESTS.inc(result="hit")
+        return path
+
+    async def add(self, name: str, size: int):
+        """Учитывает записанный файл и вытесняет старые, если кэш переполнен"""
+        await self._ensure_scanned()
+        self.bytes += size
+        self.files += 1
+        if (
+            self.bytes > self.max_bytes
+            or time.monotonic() - self._scanned_at > self.rescan_interval
+        ) and (self._scan_task is None or self._scan_task.done()):
+            self._scan_task = asyncio.get_running_loop().create_task(self._rescan())
+
+    async def _ensure_scanned(self):
+        if self._scanned_at is not None:
+            return
+        async with self._scan_lock:
+            if self._scanned_at is None:
+                await asyncio.to_thread(
+                    self.directory.mkdir, parents=True, exist_ok=True
+                )
+                await self._scan()
+                logging.info(
+                    f"Image cache: {self.files} files, {self.bytes} bytes on disk"
+                )
+
+    async def _scan(self):
+        self.bytes, self.files = await asyncio.to_thread(self._enforce_limit)
+        self._scanned_at = time.monotonic()
+
+    async def _rescan(self):
+        try:
+            await self._scan()
+        except OSError as e:
+            logging.error(f"Image cache scan failed: {str(e)}")
+
+    def _enforce_limit(self) -> Tuple[int, int]:
+        """
+        Пересчитывает объем каталога и удаляет самые старые файлы.
+        Возвращает (байты, файлы) после удаления. Выполняется в потоке
+        """
+        now = time.time()
+        files = []
+        for entry in os.scandir(self.directory):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            if entry.name.endswith(".tmp"):
+                # Свежий временный файл может еще писать другой процесс
+                if now - stat.st_mtime > STALE_TEMPORARY_SECONDS:
+                    Path(entry.path).unlink(missing_ok=True)
+                continue
+            files.append((stat.st_mtime, entry.path, stat.st_size))
+
+        total = sum(size for _, _, size in files)
+        if total > self.max_bytes:
+            target = self.max_bytes * self.low_watermark
+            files.sort()
+            while files and total > target:
+                _, path, size = files.pop(0)
+                Path(path).unlink(missing_ok=True)
+                total -= size
+                IMAGE_CACHE_EVICTIONS.inc()
+
+        return total, len(files)
+
+
+# Изображения, уменьшенные по запросу (/images/...?w=&h=)
+image_cache = DiskCache(settings.IMAGE_CACHE_DIR, settings.IMAGE_CACHE_MAX_BYTES)
+
+IMAGE_CACHE_SIZE.set_function(
+    lambda: [
+        ({"unit": "files"}, image_cache.files),
+        ({"unit": "bytes"}, image_cache.bytes),
+    ]
+)
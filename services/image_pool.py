@@ -0,0 +1,124 @@
+import asyncio
+import logging
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from fastapi import HTTPException
+from services.config import settings
+from services.metrics import metrics
+
+
+IMAGE_TASKS = metrics.gauge(
+    "image_pool_tasks",
+    "Задачи пула обработки изображений: queued - ждут процесс, running - выполняются",
+    ("state",),
+)
+IMAGE_UPLOADS = metrics.gauge(
+    "image_uploads_in_progress", "Загрузки изображений, которые сейчас обрабатываются"
+)
+IMAGE_UPLOADS_REJECTED = metrics.counter(
+    "image_uploads_rejected_total", "Загрузки, отклоненные с 503 из-за лимита"
+)
+IMAGE_POOL_RESTARTS = metrics.counter(
+    "image_pool_restarts_total", "Пересоздания пула после падения процесса"
+)
+IMAGE_TASK_SECONDS = metrics.histogram(
+    "image_task_seconds", "Время задачи в пуле изображений с ожиданием", ("task",)
+)
+
+
+class ImagePool:
+    """
+    Пул процессов для декодирования, ресайза и кодирования изображений.
+
+    Pillow держит ядро на десятки и сотни миллисекунд, поэтому работа
+    выносится из event loop в отдельные процессы: остальные запросы
+    воркера не ждут, а загрузки используют все ядра. Функции для run()
+    должны быть уровня модуля, аргументы и результат - сериализуемыми.
+
+    Число одновременных загрузок ограничено: сверх лимита сразу
+    возвращается 503 с Retry-After, чтобы не копить очередь в памяти.
+
+    Если процесс пула завершился аварийно (например, убит по памяти),
+    ProcessPoolExecutor больше не принимает задачи: пул создается заново,
+    а задачи, которые в нем выполнялись, завершаются с 503.
+    """
+
+    def __init__(self):
+        self.executor = None
+        self.workers = settings.IMAGE_WORKERS
+        self.max_uploads = settings.IMAGE_MAX_CONCURRENT_UPLOADS
+        self.retry_after = 1
+        self._uploads = 0
+        self._pending = 0
+        IMAGE_TASKS.set_function(self._task_samples)
+        IMAGE_UPLOADS.set_function(lambda: [({}, self._uploads)])
+
+    def start(self):
+        self.executor = ProcessPoolExecutor(max_workers=self.workers)
+        logging.info(f"Image pool started with {self.workers} workers")
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=True, cancel_futures=True)
+            self.executor = None
+            logging.info("Image pool stopped")
+
+    def _restart(self, broken: ProcessPoolExecutor):
+        # Несколько задач узнают о поломке одного пула, пересоздаем его один раз
+        if self.executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        IMAGE_POOL_RESTARTS.inc()
+        self.start()
+
+    def _task_samples(self):
+        running = min(self._pending, self.workers)
+        return [
+            ({"state": "queued"}, self._pending - running),
+            ({"state": "running"}, running),
+        ]
+
+    @asynccontextmanager
+    async def upload_slot(self):
+        """Занимает место для загрузки или отклоняет ее с 503"""
+        if self._uploads >= self.max_uploads:
+            IMAGE_UPLOADS_REJECTED.inc()
+            raise HTTPException(
+                status_code=503,
+                detail="Слишком много загрузок, повторите запрос позже",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        self._uploads += 1
+        try:
+            yield
+        finally:
+            self._uploads -= 1
+
+    async def run(self, fn, *args):
+        """Выполняет fn(*args) в пуле процессов и возвращает результат"""
+        # Без запущенного пула (например, в скриптах) - в пуле потоков
+        loop = asyncio.get_running_loop()
+        started = time.perf_counter()
+        executor = self.executor
+        self._pending += 1
+        try:
+            return await loop.run_in_executor(executor, fn, *args)
+        except BrokenProcessPool as e:
+            logging.error(f"Image pool is broken, restarting: {str(e)}")
+            self._restart(executor)
+            raise HTTPException(
+                status_code=503,
+                detail="Обработка изображений временно недоступна, повторите запрос",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+        finally:
+            self._pending -= 1
+            IMAGE_TASK_SECONDS.observe(
+                time.perf_counter() - started, task=fn.__name__
+            )
+
+
+# Глобальный пул обработки изображений
+image_pool = ImagePool()
@@ -1,9 +1,213 @@
+import functools
+import os
 import uuid
-from pathlib import Path
-from PIL import Image
+from pathlib import Path, PurePosixPath
+from typing import Dict, List, Optional, Tuple
+from PIL import Image, ImageOps
 import io
 
 
+# Форматы, которые сохраняются рядом с JPEG-вариантом (тот же путь, другое
+# расширение), если Pillow умеет их кодировать и файл получается меньше JPEG.
+# Расширение -> (формат Pillow, MIME-тип, параметры кодирования)
+MODERN_FORMATS = {
+    ".avif": ("AVIF", "image/avif", {"quality": 60, "speed": 6}),
+    ".webp": ("WEBP", "image/webp", {"quality": 80, "method": 4}),
+}
+
+# Сигнатуры форматов в первых байтах файла
+IMAGE_SIGNATURES = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+)
+
+
+def sniff_image_type(header: bytes) -> Optional[str]:
+    """Определяет MIME-тип изображения по первым байтам, None - не изображение"""
+    for signature, mime_type in IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return mime_type
+    if header[:4] == b"RIFF" and header[8:12] == b"WEBP":
+        return "image/webp"
+    return None
+
+
+def probe_image(image_data: bytes) -> Tuple[int, int]:
+    """
+    Возвращает (ширина, высота) по заголовку изображения. Пиксели не
+    декодируются, поэтому проверка дешевая и безопасна для "бомб".
+    """
+    with Image.open(io.BytesIO(image_data)) as image:
+        return image.size
+
+
+def compress_image(image_data: bytes, max_size: tuple) -> Tuple[bytes, int, int]:
+    """
+    Сжимает изображение до нужного размера и возвращает (JPEG, ширина, высота).
+
+    Функция уровня модуля, чтобы ее можно было выполнять в пуле процессов
+    (см. services.image_pool): аргументы и результат - только байты и числа.
+    """
+    _, width, height, encodings = render_variants(
+        image_data, {"": max_size}, modern_formats=False
+    )[0]
+    return encodings[".jpg"], width, height
+
+
+def _encode(image: Image.Image, format: str, **options) -> bytes:
+    output = io.BytesIO()
+    image.save(output, format=format, **options)
+    return output.getvalue()
+
+
+def render_variants(
+    image_data: bytes, qualities: Dict[str, tuple], modern_formats: bool = True
+) -> List[Tuple[str, int, int, Dict[str, bytes]]]:
+    """
+    Декодирует изображение один раз и создает все варианты из qualities
+    ({"thumbnail": (300, 300), ...}). Возвращает список
+    (качество, ширина, высота, {расширение: байты}) от большего варианта
+    к меньшему. ".jpg" есть всегда, ".webp" и ".avif" - если Pillow их
+    поддерживает и файл получился меньше JPEG.
+
+    Варианты получаются цепочкой: каждый следующий уменьшается из
+    предыдущего, а не из исходника. JPEG декодируется сразу в уменьшенном
+    масштабе (draft), если исходник намного больше самого большого варианта.
+    """
+    order = sorted(qualities.items(), key=lambda item: item[1][0] * item[1][1])
+    order.reverse()
+
+    image = Image.open(io.BytesIO(image_data))
+    # Для JPEG выбирает масштаб декодирования 1/2, 1/4 или 1/8,
+    # не меньше запрошенного размера; для других форматов ничего не делает
+    image.draft("RGB", order[0][1])
+
+    # Конвертируем в RGB если нужно
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    formats = supported_formats() if modern_formats else []
+
+    variants = []
+    for quality, max_size in order:
+        # Ресайз с сохранением пропорций
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+
+        encodings = {".jpg": _encode(image, "JPEG", quality=85, optimize=True)}
+        for extension in formats:
+            format, _, options = MODERN_FORMATS[extension]
+            data = _encode(image, format, **options)
+            if len(data) < len(encodings[".jpg"]):
+                encodings[extension] = data
+        width, height = image.size
+        variants.append((quality, width, height, encodings))
+    return variants
+
+
+def supported_formats() -> List[str]:
+    """Расширения из MODERN_FORMATS, которые установленный Pillow умеет сохранять"""
+    Image.init()
+    return [
+        extension
+        for extension, (format, _, _) in MODERN_FORMATS.items()
+        if format in Image.SAVE
+    ]
+
+
+@functools.lru_cache(maxsize=1024)
+def image_size(path: str, mtime_ns: int) -> Tuple[int, int]:
+    """Размеры файла изображения по заголовку, кэшируются по (путь, mtime)"""
+    with Image.open(path) as image:
+        return image.size
+
+
+def fit_size(
+    source: Tuple[int, int], size: tuple, fit: str
+) -> Optional[Tuple[int, int]]:
+    """
+    Итоговый размер для resize_image без увеличения исходника.
+    None - уменьшать не нужно, можно отдать исходник.
+
+    contain: размер вписанного изображения (одна из сторон size может
+    быть None). cover: size, пропорционально уменьшенный так, чтобы
+    поместиться в исходник.
+    """
+    source_width, source_height = source
+    width, height = size
+    if fit == "cover":
+        scale = min(source_width / width, source_height / height, 1)
+        box = (max(1, round(width * scale)), max(1, round(height * scale)))
+        return None if box == source else box
+
+    scale = min(
+        width / source_width if width else 1,
+        height / source_height if height else 1,
+    )
+    if scale >= 1:
+        return None
+    return (
+        max(1, round(source_width * scale)),
+        max(1, round(source_height * scale)),
+    )
+
+
+def resize_image(source: str, target: str, size: tuple, fit: str) -> int:
+    """
+    Уменьшает изображение source до size = (ширина, высота) и сохраняет
+    в target, формат - по расширению target. Возвращает размер файла.
+
+    fit="contain" вписывает изображение в size (одна из сторон может быть
+    None), fit="cover" заполняет size целиком, обрезая лишнее по центру.
+    Файл записывается атомарно, чтобы его не отдали недописанным.
+    """
+    image = Image.open(source)
+    width, height = size
+    box = (width or image.width, height or image.height)
+    image.draft("RGB", box)
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    if fit == "cover":
+        image = ImageOps.fit(image, box, Image.Resampling.LANCZOS)
+    else:
+        image.thumbnail(box, Image.Resampling.LANCZOS)
+
+    extension = Path(target).suffix
+    if extension in MODERN_FORMATS:
+        format, _, options = MODERN_FORMATS[extension]
+        data = _encode(image, format, **options)
+    else:
+        data = _encode(image, "JPEG", quality=85, optimize=True)
+
+    temporary = f"{target}.{os.getpid()}.tmp"
+    with open(temporary, "wb") as f:
+        f.write(data)
+    os.replace(temporary, target)
+    return len(data)
+
+
+def accepted_image_types(accept: Optional[str]) -> set:
+    """
+    MIME-типы из заголовка Accept с q > 0. Маски вроде image/* не
+    раскрываются: современные форматы отдаются, только если клиент
+    назвал их явно.
+    """
+    accepted = set()
+    for part in (accept or "").split(","):
+        media_type, *params = part.strip().split(";")
+        q = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        if media_type and q > 0:
+            accepted.add(media_type.strip().lower())
+    return accepted
+
+
 class ImageService:
     def __init__(self, upload_dir: Path):
         self.upload_dir = upload_dir
@@ -14,21 +218,24 @@ class ImageService:
         unique_name = f"{uuid.uuid4()}{extension}"
         return f"events/{event_id}/{unique_name}"
 
-    def compress_image(self, image_data: bytes, quality: str, max_size: tuple) -> bytes:
-        """Сжимает изображение до нужного размера"""
-        image = Image.open(io.BytesIO(image_data))
-
-        # Конвертируем в RGB если нужно
-        if image.mode in ("RGBA", "P"):
-            image = image.convert("RGB")
+    def generate_variant_paths(
+        self, event_id: int, qualities: List[str], extension: str
+    ) -> Dict[str, str]:
+        """Генерирует пути вариантов одного изображения: <uuid>_<качество>"""
+        unique_name = uuid.uuid4()
+        return {
+            quality: f"events/{event_id}/{unique_name}_{quality}{extension}"
+            for quality in qualities
+        }
 
-        # Ресайз с сохранением пропорций
-        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    @staticmethod
+    def with_extension(file_path: str, extension: str) -> str:
+        """Путь к варианту того же изображения в другом формате"""
+        return str(PurePosixPath(file_path).with_suffix(extension))
 
-        # Сохраняем в буфер
-        output = io.BytesIO()
-        image.save(output, format="JPEG", quality=85, optimize=True)
-        return output.getvalue()
+    def compress_image(self, image_data: bytes, quality: str, max_size: tuple) -> bytes:
+        """Сжимает изображение до нужного размера"""
+        return compress_image(image_data, max_size)[0]
 
     def save_image(self, file_path: str, image_data: bytes):
         """Сохраняет изображение на диск"""
@@ -38,8 +245,73 @@ class ImageService:
         with open(full_path, "wb") as f:
             f.write(image_data)
 
+    def resolve(self, file_path: str) -> Optional[Path]:
+        """Путь к файлу на диске, None - если путь выходит за upload_dir"""
+        root = self.upload_dir.resolve()
+        full_path = (root / file_path).resolve()
+        if root not in full_path.parents:
+            return None
+        return full_path
+
+    @staticmethod
+    def variant_group(
+        file_path: str, qualities: Dict[str, tuple]
+    ) -> Tuple[str, Optional[str]]:
+        """
+        Разбирает путь варианта events/1/<uuid>_<качество>.jpg на
+        (events/1/<uuid>, качество). Для путей без качества - (путь, None).
+        """
+        path = PurePosixPath(file_path)
+        base, _, quality = path.stem.rpartition("_")
+        if base and quality in qualities:
+            return str(path.with_name(base)), quality
+        return file_path, None
+
+    def largest_variant(self, full_path: Path, qualities: Dict[str, tuple]) -> Path:
+        """
+        Самый большой вариант того же изображения (<uuid>_<качество>.jpg)
+        или сам full_path, если вариантов нет
+        """
+        stem = full_path.stem
+        for quality in qualities:
+            if stem.endswith(f"_{quality}"):
+                largest = max(
+                    qualities, key=lambda name: qualities[name][0] * qualities[name][1]
+                )
+                # Исходник всегда JPEG: WebP/AVIF есть не у всех вариантов
+                candidate = full_path.with_name(
+                    stem[: -len(quality)] + largest + ".jpg"
+                )
+                if candidate.is_file():
+                    return candidate
+                break
+        jpeg = full_path.with_suffix(".jpg")
+        return jpeg if jpeg.is_file() else full_path
+
+    def negotiate(self, full_path: Path, accept: Optional[str]) -> Path:
+        """
+        Выбирает самый маленький файл среди full_path и его вариантов
+        в современных форматах, которые клиент принимает (Accept)
+        """
+        accepted = accepted_image_types(accept)
+        best, best_size = full_path, full_path.stat().st_size
+        for extension, (_, mime_type, _) in MODERN_FORMATS.items():
+            if mime_type not in accepted:
+                continue
+            candidate = full_path.with_suffix(extension)
+            try:
+                size = candidate.stat().st_size
+            except FileNotFoundError:
+                continue
+            if size < best_size:
+                best, best_size = candidate, size
+        return best
+
     def delete_image(self, file_path: str):
-        """Удаляет изображение"""
+        """Удаляет изображение вместе с его вариантами в других форматах"""
         full_path = self.upload_dir / file_path
-        if full_path.exists():
-            full_path.unlink()
+        for path in [full_path] + [
+            full_path.with_suffix(extension) for extension in MODERN_FORMATS
+        ]:
+            if path.exists():
+                path.unlink()
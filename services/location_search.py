@@ -0,0 +1,111 @@
+import re
+import bisect
+from typing import Dict, List, Set
+from services.reference_data import reference_data
+
+
+_NON_WORD = re.compile(r"[^\w]+")
+
+
+def normalize(text: str) -> str:
+    """Приводит название к виду для поиска: регистр, ё -> е, только буквы и цифры"""
+    text = text.casefold().replace("ё", "е")
+    return " ".join(_NON_WORD.sub(" ", text).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Триграммы слов в стиле pg_trgm: слово дополняется пробелами по краям"""
+    result = set()
+    for word in text.split():
+        padded = f"  {word} "
+        for i in range(len(padded) - 2):
+            result.add(padded[i : i + 3])
+    return result
+
+
+class LocationSearchIndex:
+    """
+    Индекс названий локаций для автодополнения.
+
+    Префиксный поиск идет бинарным поиском по отсортированному массиву,
+    где каждое название записано со всех начал слов ("парк горького"
+    и "горького"). Если префиксных совпадений мало, добираем нечеткие
+    совпадения по сходству триграмм.
+    """
+
+    MIN_SIMILARITY = 0.3
+
+    def __init__(self):
+        self._rows: List[dict] = []
+        self._names: List[str] = []
+        self._keys: List[str] = []
+        self._positions: List[tuple] = []
+        self._trigrams: Dict[str, List[int]] = {}
+        self._name_trigrams: List[Set[str]] = []
+
+    def build(self, rows: List[dict]):
+        """Перестраивает индекс по строкам справочника локаций"""
+        names = [normalize(row["name"]) for row in rows]
+        entries = []
+        postings = {}
+        name_trigrams = []
+        for idx, name in enumerate(names):
+            words = name.split(" ")
+            offset = 0
+            for word_number, word in enumerate(words):
+                # Совпадение с начала названия ранжируется выше совпадения со слова
+                entries.append((name[offset:], word_number, idx))
+                offset += len(word) + 1
+            grams = trigrams(name)
+            name_trigrams.append(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(idx)
+        entries.sort()
+
+        self._rows = rows
+        self._names = names
+        self._keys = [key for key, _, _ in entries]
+        self._positions = [(word_number, idx) for _, word_number, idx in entries]
+        self._trigrams = postings
+        self._name_trigrams = name_trigrams
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        query = normalize(query)
+        if not query:
+            return []
+
+        # Префиксные совпадения
+        matches = {}
+        start = bisect.bisect_left(self._keys, query)
+        for i in range(start, len(self._keys)):
+            if not self._keys[i].startswith(query):
+                break
+            word_number, idx = self._positions[i]
+            rank = (0 if word_number == 0 else 1, len(self._names[idx]))
+            if idx not in matches or rank < matches[idx]:
+                matches[idx] = rank
+        result = sorted(matches, key=lambda idx: (matches[idx], self._names[idx]))
+
+        # Нечеткие совпадения по триграммам
+        if len(result) < limit:
+            query_grams = trigrams(query)
+            shared = {}
+            for gram in query_grams:
+                for idx in self._trigrams.get(gram, ()):
+                    shared[idx] = shared.get(idx, 0) + 1
+            scored = []
+            for idx, count in shared.items():
+                if idx in matches:
+                    continue
+                union = len(query_grams) + len(self._name_trigrams[idx]) - count
+                similarity = count / union
+                if similarity >= self.MIN_SIMILARITY:
+                    scored.append((-similarity, self._names[idx], idx))
+            scored.sort()
+            result += [idx for _, _, idx in scored]
+
+        return [self._rows[idx] for idx in result[:limit]]
+
+
+location_search_index = LocationSearchIndex()
+reference_data.locations.on_refresh(location_search_index.build)
@@ -0,0 +1,142 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+import orjson
+from database import db
+from services.cache import cache_invalidator
+from services.config import settings
+from services.http_cache import CachedBody
+
+
+CATEGORIES_QUERY = "SELECT id, name FROM event_categories ORDER BY name"
+LOCATIONS_QUERY = "SELECT id, name FROM locations ORDER BY name"
+
+
+class ReferenceTable:
+    """
+    Справочник id -> name с готовым отсортированным JSON-ответом.
+
+    Перечитывается по уведомлению об изменении, а также в фоне при
+    обращении, если загружен больше ttl секунд назад: изменения,
+    сделанные в обход приложения, тоже со временем подхватываются.
+    """
+
+    def __init__(self, name: str, query: str, ttl: float = 300):
+        self.name = name
+        self.query = query
+        self.ttl = ttl
+        self.names: Dict[int, str] = {}
+        self.json: Optional[CachedBody] = None
+        self.loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refresh_handlers = []
+        self._refresh_task = None
+        self._stale = False
+        self._miss_refreshed_at = 0.0
+
+    @property
+    def loaded(self) -> bool:
+        return self.json is not None
+
+    def on_refresh(self, handler):
+        """Регистрирует handler(rows) для построения производных индексов"""
+        self._refresh_handlers.append(handler)
+
+    async def ensure_loaded(self):
+        if not self.loaded:
+            await self.refresh(force=False)
+        elif time.monotonic() - self.loaded_at > self.ttl:
+            self.invalidate()
+
+    async def refresh(self, force: bool = True):
+        """
+        Перечитывает справочник из БД. С force=False ничего не делает,
+        если справочник уже загружен: одновременные первые обращения
+        ждут одну загрузку, а не читают его каждый заново.
+        """
+        async with self._lock:
+            if not force and self.loaded:
+                return
+            # Только с основного сервера: обновление по уведомлению начинается
+            # сразу после записи, реплика может ее еще не получить
+            result = await db.fetch(self.query, use_replica=False)
+            rows = [{"id": record["id"], "name": record["name"]} for record in result]
+            self.names = {row["id"]: row["name"] for row in rows}
+            self.json = CachedBody(orjson.dumps(rows))
+            self.loaded_at = time.monotonic()
+            for handler in self._refresh_handlers:
+                handler(rows)
+            logging.info(f"Reference data {self.name} loaded: {len(rows)} rows")
+
+    async def get_json(self) -> CachedBody:
+        await self.ensure_loaded()
+        return self.json
+
+    async def exists(self, item_id: int) -> bool:
+        """
+        Проверяет наличие записи за O(1). Если записи нет, справочник
+        перечитывается: она могла появиться в другом процессе. Повторные
+        запросы с несуществующими ID перечитывают его не чаще раза
+        в REFERENCE_MISS_REFRESH_INTERVAL секунд.
+        """
+        await self.ensure_loaded()
+        if item_id in self.names:
+            return True
+        now = time.monotonic()
+        if now - self._miss_refreshed_at < settings.REFERENCE_MISS_REFRESH_INTERVAL:
+            return False
+        self._miss_refreshed_at = now
+        await self.refresh()
+        return item_id in self.names
+
+    def invalidate(self, keys: list = None):
+        """Перечитывает справочник в фоне после изменения данных"""
+        # Если обновление уже идет, оно могло начаться до изменения:
+        # после него справочник перечитывается еще раз
+        self._stale = True
+        if self._refresh_task is not None and not self._refresh_task.done():
+            return
+        self._refresh_task = asyncio.get_running_loop().create_task(
+            self._refresh_safely()
+        )
+
+    async def _refresh_safely(self):
+        while self._stale:
+            self._stale = False
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.error(f"Failed to refresh reference data {self.name}: {str(e)}")
+                return
+
+
+class ReferenceData:
+    """Справочники категорий и локаций в памяти процесса"""
+
+    def __init__(self):
+        self.categories = ReferenceTable(
+            "event_categories", CATEGORIES_QUERY, ttl=settings.REFERENCE_DATA_TTL
+        )
+        self.locations = ReferenceTable(
+            "locations", LOCATIONS_QUERY, ttl=settings.REFERENCE_DATA_TTL
+        )
+
+    async def load(self):
+        """Загружает справочники при старте приложения"""
+        for table in (self.categories, self.locations):
+            try:
+                await table.refresh()
+            except Exception as e:
+                # Не мешаем старту: справочник загрузится при первом запросе
+                logging.error(f"Failed to load reference data {table.name}: {str(e)}")
+
+    def reset(self):
+        for table in (self.categories, self.locations):
+            table.invalidate()
+
+
+reference_data = ReferenceData()
+cache_invalidator.subscribe("event_categories", reference_data.categories.invalidate)
+cache_invalidator.subscribe("locations", reference_data.locations.invalidate)
+cache_invalidator.on_reset(reference_data.reset)
@@ -0,0 +1,73 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable
+from services.metrics import metrics
+
+
+SINGLE_FLIGHT_CALLS = metrics.counter(
+    "single_flight_calls_total",
+    "Вызовы через single-flight: leader - выполнил запрос, shared - ждал чужой",
+    ("group", "result"),
+)
+SINGLE_FLIGHT_IN_FLIGHT = metrics.gauge(
+    "single_flight_in_flight", "Выполняющиеся сейчас вызовы по группам", ("group",)
+)
+
+_groups = []
+
+
+class SingleFlight:
+    """
+    Объединяет одинаковые одновременные вызовы в один.
+
+    Первый вызов do() с ключом запускает fn() в отдельной задаче, остальные
+    вызовы с тем же ключом ждут ее и получают тот же результат или ту же
+    ошибку. Задача защищена от отмены: если клиент первого запроса
+    отключился, остальные все равно получат ответ. После завершения ключ
+    удаляется, следующий вызов снова идет в источник.
+
+    Результат общий для всех ожидающих, изменять его нельзя.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls = {}
+        _groups.append(self)
+
+    def __len__(self):
+        return len(self._calls)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        return await asyncio.shield(self.start(key, fn))
+
+    def start(self, key: Hashable, fn: Callable[[], Awaitable]) -> asyncio.Future:
+        """Запускает fn() в фоне, если вызов с этим ключом еще не выполняется"""
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="leader")
+        else:
+            SINGLE_FLIGHT_CALLS.inc(group=self.name, result="shared")
+        return task
+
+    def _forget(self, key, task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Помечаем ошибку как полученную, даже если все ожидающие отменены
+        if not task.cancelled():
+            task.exception()
+
+
+def flight_key(*parts):
+    """Ключ для SingleFlight или None, если аргументы нельзя хэшировать"""
+    try:
+        hash(parts)
+    except TypeError:
+        return None
+    return parts
+
+
+SINGLE_FLIGHT_IN_FLIGHT.set_function(
+    lambda: [({"group": group.name}, len(group)) for group in _groups]
+)